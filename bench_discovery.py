@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ViVeTool Manager v3.9 - 安装目录搜索基准
+在临时目录中生成合成的目录树（大量普通目录和文件、应被剪枝的 node_modules/.git、
+若干 ViVeTool 安装），计时 discover_vivetool 并检查找到的安装及其排序；
+结果不符合预期时以退出代码 1 结束
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+from utils import discover_vivetool
+
+
+# 默认规模：普通目录数、每个最深层目录中的文件数、node_modules 中的目录数
+BENCH_DIRS = 10000
+BENCH_FILES_PER_DIR = 20
+BENCH_PRUNED_DIRS = 5000
+# 测量次数（取最小值）与搜索深度
+BENCH_RUNS = 5
+BENCH_DEPTH = 4
+
+
+def touch(path: Path):
+    with open(path, "wb"):
+        pass
+
+
+def generate(base: Path, dirs: int, files_per_dir: int, pruned: int) -> Tuple[List[Path], List[str]]:
+    """生成合成目录树，返回 (搜索根目录, 期望找到的安装目录，按期望顺序)"""
+    downloads, desktop, documents = base / "Downloads", base / "Desktop", base / "Documents"
+    roots = [downloads, desktop, documents]
+
+    # 普通目录：三层，每层分支数相同，文件放在最深层
+    fanout = max(1, round(dirs ** (1 / 3)))
+    for i in range(fanout):
+        for j in range(fanout):
+            for k in range(fanout):
+                leaf = documents / f"project{i}" / f"module{j}" / f"part{k}"
+                leaf.mkdir(parents=True)
+                for n in range(files_per_dir):
+                    touch(leaf / f"file{n}.txt")
+
+    # 应被剪枝的大目录，其中的 ViVeTool 不应被找到
+    modules = downloads / "app" / "node_modules"
+    for i in range(pruned):
+        (modules / f"pkg{i}").mkdir(parents=True)
+    touch(modules / "pkg0" / "ViVeTool.exe")
+    (downloads / ".git" / "objects").mkdir(parents=True)
+    touch(downloads / ".git" / "objects" / "ViVeTool.exe")
+    # 超出搜索深度的安装
+    deep = documents / "a" / "b" / "c" / "d" / "ViVeTool-v9.9"
+    deep.mkdir(parents=True)
+    touch(deep / "ViVeTool.exe")
+
+    installs = [
+        downloads / "ViVeTool-v0.3.5",
+        downloads / "ViVeTool-v0.3.4" / "ViVeTool-v0.3.4",
+        desktop / "tools",
+    ]
+    for folder in installs:
+        folder.mkdir(parents=True)
+        touch(folder / "ViVeTool.exe")
+    return roots, [str(p) for p in installs]
+
+
+def count_entries(base: Path) -> Tuple[int, int]:
+    """统计目录树中的 (目录数, 文件数)"""
+    dirs = files = 0
+    for _, dirnames, filenames in os.walk(base):
+        dirs += len(dirnames)
+        files += len(filenames)
+    return dirs, files
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="ViVeTool discovery benchmark on a synthetic directory tree")
+    parser.add_argument("--dirs", type=int, default=BENCH_DIRS, help="regular directories (default 10000)")
+    parser.add_argument("--files", type=int, default=BENCH_FILES_PER_DIR, help="files per leaf directory (default 20)")
+    parser.add_argument("--pruned", type=int, default=BENCH_PRUNED_DIRS,
+                        help="directories inside the pruned node_modules (default 5000)")
+    parser.add_argument("--runs", type=int, default=BENCH_RUNS)
+    parser.add_argument("--depth", type=int, default=BENCH_DEPTH)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        base = Path(folder)
+        start = time.perf_counter()
+        roots, expected = generate(base, args.dirs, args.files, args.pruned)
+        dirs, files = count_entries(base)
+        print(f"tree        {dirs} dirs, {files} files ({time.perf_counter() - start:.1f} s to generate)")
+
+        times = []
+        found: List[str] = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            found = discover_vivetool(roots, depth=args.depth)
+            times.append(time.perf_counter() - start)
+        print(f"discover    {min(times) * 1000:8.1f} ms (fastest of {args.runs}, depth {args.depth})")
+
+        for path in found:
+            print(f"  found     {os.path.relpath(path, folder)}")
+        if found != expected:
+            print("unexpected result, expected:")
+            for path in expected:
+                print(f"  expected  {os.path.relpath(path, folder)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ViVeTool Manager v3.9 - 启动导入基准
+用 python -X importtime 测量导入 main / cli 的耗时，--paint 时在 Xvfb 中测量主窗口的首帧与可交互耗时，
+--log-rate 时测量日志框每秒写入的行数（批量写入与改动前的逐行写入对比，只报告不比较基线）；
+每次测量都紧接着测一次参考导入（REFERENCE_MODULES），取两者耗时比的中位数与基线比较，
+基线因此与机器快慢和测量时的负载无关，可以提交到仓库。
+超过基线（加容差）或导入了应延迟加载的模块时以退出代码 1 结束
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import time
+import shutil
+import tempfile
+import compileall
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+
+ROOT = Path(__file__).parent
+BASELINE_PATH = ROOT / "bench_startup.json"
+# 每个入口测量的次数（耗时比取中位数）
+BENCH_RUNS = 9
+# 允许超出基线的比例
+BENCH_TOLERANCE = 0.25
+# 参考导入：只用标准库，耗时随机器快慢同比变化，作为各项耗时的单位
+REFERENCE_MODULES = ("tkinter", "json", "re", "threading", "pathlib", "typing", "array", "bisect")
+
+# 启动时不应导入的模块：这些模块在第一次用到时才加载
+DEFERRED = {
+    "main": (
+        "subprocess", "ctypes", "sqlite3", "gzip", "shutil", "argparse",
+        "tkinter.messagebox", "tkinter.filedialog", "tkinter.simpledialog",
+    ),
+    "cli": ("tkinter", "subprocess", "ctypes", "sqlite3", "gzip", "shutil"),
+}
+
+# 界面测量：Xvfb 屏幕参数、等待其就绪的时间（秒）、单次测量的时限（秒）
+XVFB_SCREEN = "1280x800x24"
+XVFB_START_TIMEOUT = 10
+PAINT_TIMEOUT = 60
+
+# 在子进程中启动主窗口，输出从进程开始到首帧、可交互的耗时（微秒）后关闭
+_PAINT_SCRIPT = """
+import time
+start = time.perf_counter()
+import json
+import tkinter as tk
+import main
+root = tk.Tk()
+app = main.ViveToolApp(root)
+def check():
+    times = app.startup_times
+    if "interactive" not in times:
+        root.after(5, check)
+        return
+    print(json.dumps({name: int((times[name] - start) * 1e6) for name in ("first_paint", "interactive")}))
+    root.destroy()
+root.after(5, check)
+root.mainloop()
+"""
+
+# 主窗口可交互后写入 LINES 行日志：先按改动前 log() 的方式逐行写入，再经 log() 排队由 flush_log 批量写入，
+# 输出两种方式每秒写入的行数
+_LOG_RATE_SCRIPT = """
+import time
+import json
+import tkinter as tk
+import main
+LINES = {lines}
+root = tk.Tk()
+app = main.ViveToolApp(root)
+result = {{}}
+def per_line(message, level):
+    text = app.log_text
+    text.config(state="normal")
+    text.insert(tk.END, message + "\\n")
+    text.tag_add(level, "end-2c linestart", "end-1c")
+    text.see(tk.END)
+    text.config(state="disabled")
+    root.update_idletasks()
+def wait(start):
+    if app.log_pending:
+        root.after(1, wait, start)
+        return
+    root.update_idletasks()
+    result["batched"] = LINES / (time.perf_counter() - start)
+    print(json.dumps(result))
+    root.destroy()
+def check():
+    if "interactive" not in app.startup_times:
+        root.after(5, check)
+        return
+    start = time.perf_counter()
+    for i in range(LINES):
+        per_line(f"bench line {{i}}", "info")
+    result["per_line"] = LINES / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for i in range(LINES):
+        app.log(f"bench line {{i}}", "info")
+    wait(start)
+root.after(5, check)
+root.mainloop()
+"""
+# --log-rate 每次写入的日志行数
+LOG_RATE_LINES = 5000
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def measure(module: str) -> Tuple[int, Set[str]]:
+    """在新进程中导入模块一次（可用逗号分隔多个），返回 (累计耗时微秒, 导入过程中加载的模块)"""
+    names = {name.strip() for name in module.split(",")}
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+    total, loaded = 0, set()
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        loaded.add(match.group(4))
+        if not match.group(3) and match.group(4) in names:
+            total += int(match.group(2))
+    return total, loaded
+
+
+def measure_reference() -> int:
+    """参考导入一次的累计耗时（微秒）"""
+    return measure(", ".join(REFERENCE_MODULES))[0]
+
+
+def bench(module: str, runs: int) -> Tuple[float, int, Set[str]]:
+    """与参考导入交替测量，返回 (耗时比的中位数, 最短耗时微秒, 导入过程中加载的模块)"""
+    ratios: List[float] = []
+    times: List[int] = []
+    loaded: Set[str] = set()
+    for _ in range(runs):
+        reference = measure_reference()
+        total, modules = measure(module)
+        ratios.append(total / reference)
+        times.append(total)
+        loaded |= modules
+    return statistics.median(ratios), min(times), loaded
+
+
+def start_xvfb() -> Tuple[subprocess.Popen, str]:
+    """在空闲的显示号上启动 Xvfb，返回 (进程, DISPLAY)"""
+    if not shutil.which("Xvfb"):
+        raise RuntimeError("Xvfb not found (install xvfb, or run with an existing DISPLAY)")
+    number = 99
+    while os.path.exists(f"/tmp/.X{number}-lock"):
+        number += 1
+    proc = subprocess.Popen(
+        ["Xvfb", f":{number}", "-screen", "0", XVFB_SCREEN, "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + XVFB_START_TIMEOUT
+    while not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+        if proc.poll() is not None or time.monotonic() > deadline:
+            proc.kill()
+            raise RuntimeError("Xvfb did not start")
+        time.sleep(0.05)
+    return proc, f":{number}"
+
+
+def run_gui(script: str, runs: int, before: Optional[Callable[[], None]] = None) -> Iterator[Dict[str, float]]:
+    """运行主窗口脚本 runs 次，逐次产出其最后一行输出的 JSON；每次运行前先调用 before
+
+    在程序文件的临时副本中运行，自动搜索和方案数据库不会改动工作目录中的配置。
+    """
+    xvfb = None
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    if sys.platform.startswith("linux") and "DISPLAY" not in env:
+        xvfb, env["DISPLAY"] = start_xvfb()
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            for path in ROOT.iterdir():
+                if path.suffix == ".py" or path.name in ("config.json", "features.bin"):
+                    shutil.copy2(path, folder)
+            shutil.copytree(ROOT / "lang", Path(folder) / "lang")
+            compileall.compile_dir(folder, maxlevels=0, quiet=1)
+            for _ in range(runs):
+                if before is not None:
+                    before()
+                proc = subprocess.run(
+                    [sys.executable, "-c", script],
+                    cwd=folder, env=env, capture_output=True, text=True, timeout=PAINT_TIMEOUT,
+                )
+                if proc.returncode != 0:
+                    raise RuntimeError(f"GUI start failed:\n{proc.stderr}")
+                yield json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        if xvfb is not None:
+            xvfb.kill()
+            xvfb.wait()
+
+
+def bench_paint(runs: int) -> Dict[str, Tuple[float, int]]:
+    """首帧与可交互耗时，返回 {名称: (与参考导入耗时比的中位数, 最短耗时微秒)}"""
+    references: List[int] = []
+    ratios: Dict[str, List[float]] = {}
+    best: Dict[str, int] = {}
+    for result in run_gui(_PAINT_SCRIPT, runs, lambda: references.append(measure_reference())):
+        for name, value in result.items():
+            ratios.setdefault(name, []).append(value / references[-1])
+            best[name] = min(value, best.get(name, value))
+    return {name: (statistics.median(ratios[name]), best[name]) for name in best}
+
+
+def bench_log_rate(runs: int, lines: int = LOG_RATE_LINES) -> Dict[str, float]:
+    """日志框每秒写入的行数：{"per_line": 逐行写入, "batched": 批量写入}，各取多次测量的最大值"""
+    best: Dict[str, float] = {}
+    for result in run_gui(_LOG_RATE_SCRIPT.format(lines=lines), runs):
+        for name, value in result.items():
+            best[name] = max(value, best.get(name, value))
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Startup import-time regression benchmark")
+    parser.add_argument("modules", nargs="*", default=list(DEFERRED), help="entry modules (default: main cli)")
+    parser.add_argument("--runs", type=int, default=BENCH_RUNS)
+    parser.add_argument("--tolerance", type=float, default=BENCH_TOLERANCE,
+                        help="allowed slowdown over the baseline (default 0.25)")
+    parser.add_argument("--update", action="store_true",
+                        help="record the measured ratios to the reference import as the new baseline")
+    parser.add_argument("--paint", action="store_true",
+                        help="also measure time to first paint and to interactive (Xvfb on Linux)")
+    parser.add_argument("--log-rate", action="store_true",
+                        help="also measure log lines per second, per-line vs batched (Xvfb on Linux); "
+                             "--update records the rates in the baseline file for reference")
+    args = parser.parse_args(argv)
+
+    # 先编译字节码，避免把编译时间算进导入耗时
+    compileall.compile_dir(str(ROOT), maxlevels=0, quiet=1)
+
+    try:
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            baseline: Dict[str, float] = json.load(f)
+    except (OSError, ValueError):
+        baseline = {}
+
+    failed = False
+    measured: Dict[str, float] = {}
+
+    def report(name: str, ratio: float, total: int):
+        nonlocal failed
+        ratio = round(ratio, 3)
+        measured[name] = ratio
+        limit = baseline.get(name)
+        line = f"{name:<11} {total / 1000:8.1f} ms  {ratio:6.2f}x ref"
+        if limit:
+            line += f"  (baseline {limit:.2f}x, {ratio / limit - 1:+.0%})"
+            if not args.update and ratio > limit * (1 + args.tolerance):
+                line += "  SLOWER"
+                failed = True
+        print(line)
+
+    for module in args.modules:
+        ratio, total, loaded = bench(module, args.runs)
+        report(module, ratio, total)
+        eager = [name for name in DEFERRED.get(module, ()) if name in loaded]
+        if eager:
+            print(f"            imported at startup: {', '.join(eager)}")
+            failed = True
+
+    if args.paint:
+        try:
+            for name, (ratio, total) in bench_paint(args.runs).items():
+                report(name, ratio, total)
+        except (RuntimeError, OSError, subprocess.TimeoutExpired) as e:
+            print(f"paint benchmark failed: {e}")
+            failed = True
+
+    if args.log_rate:
+        try:
+            rates = bench_log_rate(args.runs)
+            print(f"{'log rate':<11} {rates['per_line']:8.0f} lines/s per-line, "
+                  f"{rates['batched']:.0f} lines/s batched ({rates['batched'] / rates['per_line']:.1f}x)")
+            # 只记录，不作为比较基线（吞吐与机器相关）
+            if args.update:
+                measured.update({f"log_rate_{name}": round(rate) for name, rate in rates.items()})
+        except (RuntimeError, OSError, subprocess.TimeoutExpired) as e:
+            print(f"log rate benchmark failed: {e}")
+            failed = True
+
+    if args.update:
+        baseline.update(measured)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=4)
+            f.write("\n")
+        print(f"baseline saved to {BASELINE_PATH.name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
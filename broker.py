@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ViVeTool Manager v3.9 - 提权代理模块
+只提权一次的常驻工作进程，通过本地 IPC 接收命令（Windows 命名管道，其他平台 Unix 套接字）
+
+管道由未提权的客户端创建并监听，提权的代理主动连接：客户端拥有管道，代理进程不接受任何连接。
+消息为 JSON（send_bytes/recv_bytes，不经过 pickle），代理先校验消息格式，
+且只执行启动时指定的 ViVeTool 的 /enable、/disable、/query 命令；
+认证密钥通过只有当前用户可读的临时文件传递，代理读取后立即删除。
+Windows 命名管道（实际使用的平台）尚未实测，只在 Linux 的 Unix 套接字上验证过，
+因此 use_broker 默认关闭。
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import secrets
+import argparse
+import tempfile
+import itertools
+import threading
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils import run_command_captured
+
+
+# 代理空闲多久后自动退出（秒）
+BROKER_IDLE_TIMEOUT = 300
+# 启动代理后等待其连接的时间（秒）
+BROKER_CONNECT_TIMEOUT = 30
+# 代理接受的 ViVeTool 命令
+BROKER_COMMANDS = ("/enable", "/disable", "/query")
+# 单条消息的长度上限（字节）：请求只含一行命令；结果含整批输出
+BROKER_MAX_REQUEST = 64 * 1024
+BROKER_MAX_RESULT = 64 * 1024 * 1024
+
+_ID_ARG_RE = re.compile(r"/id:\d+(?:,\d+)*\Z")
+
+
+def default_address() -> Tuple[str, str]:
+    """生成一个新的 IPC 地址，返回 (地址, 地址族)；Unix 套接字放在新建的临时目录中，由客户端用完后删除"""
+    name = f"vivetool-broker-{os.getpid()}-{secrets.token_hex(4)}"
+    if sys.platform == "win32":
+        return rf"\\.\pipe\{name}", "AF_PIPE"
+    return os.path.join(tempfile.mkdtemp(), name + ".sock"), "AF_UNIX"
+
+
+def send_message(conn, message: dict):
+    """以 JSON 发送一条消息"""
+    conn.send_bytes(json.dumps(message, ensure_ascii=False).encode("utf-8"))
+
+
+def recv_message(conn, maxlength: int) -> dict:
+    """接收一条 JSON 消息；超长、无法解析或不是对象时抛出 ValueError（超长时为 OSError）"""
+    message = json.loads(conn.recv_bytes(maxlength).decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("message is not an object")
+    return message
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def check_request(args, exe: str) -> Optional[str]:
+    """检查请求的命令行，不允许时返回原因"""
+    if not isinstance(args, list) or not all(isinstance(a, str) for a in args):
+        return "invalid request"
+    if len(args) < 2 or os.path.normcase(os.path.abspath(args[0])) != os.path.normcase(exe):
+        return "only the configured ViVeTool may be run"
+    if args[1] not in BROKER_COMMANDS:
+        return f"command not allowed: {args[1]}"
+    ids = args[2:]
+    if len(ids) > 1 or (ids and not _ID_ARG_RE.match(ids[0])) or (not ids and args[1] != "/query"):
+        return "invalid /id argument"
+    return None
+
+
+def write_key_file(authkey: bytes) -> str:
+    """把认证密钥写入只有当前用户可访问的临时目录，返回文件路径"""
+    path = os.path.join(tempfile.mkdtemp(), "broker.key")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(authkey.hex())
+    return path
+
+
+def read_key_file(path: str) -> bytes:
+    """读取并删除认证密钥文件"""
+    try:
+        with open(path, "r") as f:
+            return bytes.fromhex(f.read().strip())
+    finally:
+        try:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            pass
+
+
+# ============== 代理进程 ==============
+class BrokerServer:
+    """代理进程：连接客户端后，每个请求在独立线程中执行，输出和结果按请求 ID 异步返回"""
+
+    def __init__(self, address: str, family: str, authkey: bytes, exe: str,
+                 idle_timeout: float = BROKER_IDLE_TIMEOUT):
+        self.conn = Client(address, family, authkey=authkey)
+        self.exe = os.path.normcase(os.path.abspath(exe))
+        self.idle_timeout = idle_timeout
+        self.last_active = time.monotonic()
+        self.running = 0
+        self._lock = threading.Lock()
+
+    def serve(self):
+        threading.Thread(target=self._watchdog, daemon=True).start()
+        self._handle(self.conn)
+
+    def _touch(self):
+        with self._lock:
+            self.last_active = time.monotonic()
+
+    def _watchdog(self):
+        while True:
+            time.sleep(1)
+            with self._lock:
+                idle = self.running == 0 and time.monotonic() - self.last_active > self.idle_timeout
+            if idle:
+                # recv() 无法从其他线程可靠中断，直接退出进程
+                os._exit(0)
+
+    def _handle(self, conn):
+        send_lock = threading.Lock()
+
+        def send(message):
+            with send_lock:
+                try:
+                    send_message(conn, message)
+                except (OSError, EOFError):
+                    pass
+
+        def run(request):
+            rid = request["id"]
+            error = check_request(request["args"], self.exe)
+            if error is not None:
+                send({"id": rid, "type": "done", "code": -1, "output": error, "duration": 0.0})
+            else:
+                code, output, duration = run_command_captured(
+                    request["args"],
+                    os.path.dirname(self.exe),
+                    lambda line, stream: send({"id": rid, "type": "output", "line": line, "stream": stream}),
+                )
+                send({"id": rid, "type": "done", "code": code, "output": output, "duration": duration})
+            with self._lock:
+                self.running -= 1
+                self.last_active = time.monotonic()
+
+        while True:
+            try:
+                request = recv_message(conn, BROKER_MAX_REQUEST)
+            except (OSError, EOFError, ValueError):
+                break
+            self._touch()
+            # 格式不对的消息视同断开：只接受 run（带整数 ID 和字符串列表）与 shutdown
+            if request.get("type") != "run" or not _is_int(request.get("id")) or not isinstance(request.get("args"), list):
+                break
+            with self._lock:
+                self.running += 1
+            threading.Thread(target=run, args=(request,), daemon=True).start()
+        # 客户端断开或要求退出：不再等待新的连接
+        os._exit(0)
+
+
+def serve_main(argv: Optional[List[str]] = None):
+    """代理进程入口"""
+    parser = argparse.ArgumentParser(description="ViVeTool broker")
+    parser.add_argument("--address", required=True)
+    parser.add_argument("--family", required=True)
+    parser.add_argument("--key-file", required=True)
+    parser.add_argument("--exe", required=True)
+    parser.add_argument("--idle", type=float, default=BROKER_IDLE_TIMEOUT)
+    args = parser.parse_args(argv)
+    authkey = read_key_file(args.key_file)
+    BrokerServer(args.address, args.family, authkey, args.exe, args.idle).serve()
+
+
+# ============== 客户端 ==============
+class BrokerClient:
+    """代理客户端：监听管道等待代理连接，请求带 ID 流水线发送，结果通过 Future 异步返回"""
+
+    def __init__(self, exe: str, address: Optional[str] = None, family: Optional[str] = None,
+                 authkey: Optional[bytes] = None, idle_timeout: float = BROKER_IDLE_TIMEOUT):
+        # 自动生成的 Unix 套接字地址所在的临时目录，关闭管道时删除
+        self._socket_dir = None
+        if address is None:
+            address, family = default_address()
+            if family == "AF_UNIX":
+                self._socket_dir = os.path.dirname(address)
+        self.exe = exe
+        self.address = address
+        self.family = family
+        self.authkey = authkey or secrets.token_bytes(16)
+        self.idle_timeout = idle_timeout
+        self.listener = None
+        self.conn = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Tuple[Future, Optional[Callable[[str, str], None]]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self.conn is not None
+
+    def listen(self):
+        """创建管道（必须在启动代理之前）"""
+        self.listener = Listener(self.address, self.family, authkey=self.authkey)
+
+    def launch(self, elevate: bool = True) -> bool:
+        """启动代理进程（Windows 下请求一次 UAC 提权）"""
+        if getattr(sys, "frozen", False):
+            cmd = [sys.executable, "--broker"]
+        else:
+            cmd = [sys.executable, os.path.abspath(__file__)]
+        cmd += [
+            "--address", self.address,
+            "--family", self.family,
+            "--key-file", write_key_file(self.authkey),
+            "--exe", os.path.abspath(self.exe),
+            "--idle", str(self.idle_timeout),
+        ]
+        if elevate and sys.platform == "win32":
+            import ctypes
+            import subprocess
+            params = subprocess.list2cmdline(cmd[1:])
+            ret = ctypes.windll.shell32.ShellExecuteW(None, "runas", cmd[0], params, None, 0)
+            return ret > 32
+        import subprocess
+        subprocess.Popen(cmd, stdin=subprocess.DEVNULL)
+        return True
+
+    def connect(self, timeout: float = BROKER_CONNECT_TIMEOUT) -> bool:
+        """等待代理连接，认证失败的连接会被丢弃；超时后关闭管道"""
+        accepted: List = []
+        gave_up = threading.Event()
+
+        def accept():
+            while not gave_up.is_set():
+                try:
+                    conn = self.listener.accept()
+                except AuthenticationError:
+                    continue
+                except (OSError, EOFError):
+                    return
+                if gave_up.is_set():
+                    # 超时后才连上的代理：断开，它会随之退出
+                    conn.close()
+                    return
+                accepted.append(conn)
+                return
+
+        thread = threading.Thread(target=accept, daemon=True)
+        thread.start()
+        thread.join(timeout)
+        gave_up.set()
+        # 只接受一个连接
+        self._close_listener()
+        if not accepted:
+            return False
+        self.conn = accepted[0]
+        threading.Thread(target=self._receiver, daemon=True).start()
+        return True
+
+    def start(self, elevate: bool = True) -> bool:
+        """创建管道、启动代理并等待其连接"""
+        self.listen()
+        if not self.launch(elevate):
+            self._close_listener()
+            return False
+        return self.connect()
+
+    def _close_listener(self):
+        """关闭管道（Unix 套接字文件随之删除），并删除其临时目录"""
+        try:
+            self.listener.close()
+        except OSError:
+            pass
+        self.listener = None
+        if self._socket_dir is not None:
+            try:
+                os.rmdir(self._socket_dir)
+            except OSError:
+                pass
+            self._socket_dir = None
+
+    def submit(self, args: List[str], on_output: Optional[Callable[[str, str], None]] = None) -> Future:
+        """发送命令，立即返回 Future，结果为 (退出代码, 输出, 耗时)
+
+        args[0] 必须是启动代理时指定的 ViVeTool，命令在其所在目录中执行。
+        """
+        future = Future()
+        rid = next(self._ids)
+        with self._lock:
+            if self.conn is None:
+                future.set_exception(ConnectionError("代理未连接"))
+                return future
+            self._pending[rid] = (future, on_output)
+            try:
+                send_message(self.conn, {"type": "run", "id": rid, "args": [str(a) for a in args]})
+            except (OSError, EOFError) as e:
+                del self._pending[rid]
+                future.set_exception(ConnectionError(f"发送命令失败: {e}"))
+        return future
+
+    def _receiver(self):
+        while True:
+            try:
+                message = recv_message(self.conn, BROKER_MAX_RESULT)
+            except (OSError, EOFError, ValueError):
+                break
+            if not _is_int(message.get("id")) or message.get("type") not in ("output", "done"):
+                break
+            with self._lock:
+                entry = self._pending.get(message["id"])
+                if entry is not None and message["type"] == "done":
+                    del self._pending[message["id"]]
+            if entry is None:
+                continue
+            future, on_output = entry
+            if message["type"] == "output":
+                if on_output is not None:
+                    on_output(str(message.get("line", "")), str(message.get("stream", "stdout")))
+            else:
+                future.set_result((message.get("code", -1), str(message.get("output", "")), message.get("duration", 0.0)))
+        self._disconnect(ConnectionError("代理连接已断开"))
+
+    def _disconnect(self, error: Exception):
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+            if self.conn is not None:
+                try:
+                    self.conn.close()
+                except OSError:
+                    pass
+            self.conn = None
+        for future, _ in pending:
+            future.set_exception(error)
+
+    def shutdown(self):
+        """通知代理退出"""
+        with self._lock:
+            if self.conn is not None:
+                try:
+                    send_message(self.conn, {"type": "shutdown"})
+                except (OSError, EOFError):
+                    pass
+
+
+if __name__ == "__main__":
+    serve_main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ViVeTool Manager v3.9 - 功能目录模块
+紧凑的功能 ID/名称目录：内存映射的二进制文件，按 ID 二分查找，按名称前缀/子串搜索
+"""
+
+import os
+import re
+import sys
+import mmap
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+CATALOG_PATH = Path(__file__).parent / "features.bin"
+# 搜索结果默认条数
+CATALOG_SEARCH_LIMIT = 50
+
+# 文件头：魔数、版本、字节序（0 小端 / 1 大端）、ID 数、名称数、名称区字节数、小写名称区字节数
+_MAGIC = b"VVFC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHIIII")
+
+# 目录文本的每一行：“名称: ID”、“ID: 名称”、“名称,ID” 之类，取第一个数字为 ID，其余为名称
+_LINE_RE = re.compile(r"^\s*(?:(\d+)\s*[:,=\t ]\s*(.+?)|(.+?)\s*[:,=\t ]\s*(\d+))\s*$")
+
+
+def parse_catalog(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """流式解析功能字典文本，产出 (ID, 名称)，跳过空行和 # 注释"""
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith(("#", "//")):
+            continue
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        if match.group(1):
+            fid, name = match.group(1), match.group(2)
+        else:
+            name, fid = match.group(3), match.group(4)
+        fid = int(fid)
+        if 0 < fid <= 0xFFFFFFFF:
+            yield fid, name.strip().strip('"')
+
+
+def build_catalog(entries: Iterable[Tuple[int, str]], path: Optional[Path] = None) -> int:
+    """把 (ID, 名称) 写成目录文件（先写临时文件再替换），返回 ID 数；同一 ID 以最后一条为准"""
+    path = Path(path) if path else CATALOG_PATH
+    names_by_id: Dict[int, str] = {}
+    for fid, name in entries:
+        names_by_id[fid] = sys.intern(name)
+
+    # 名称去重后按小写排序，便于前缀二分
+    names = sorted(set(names_by_id.values()), key=lambda n: (n.lower(), n))
+    name_index = {name: i for i, name in enumerate(names)}
+
+    ids = array("I", sorted(names_by_id))
+    id_names = array("I", (name_index[names_by_id[fid]] for fid in ids))
+
+    # 按名称分组的 ID：name_starts[i]..name_starts[i+1] 为第 i 个名称下的 ID
+    groups: List[List[int]] = [[] for _ in names]
+    for fid, ni in zip(ids, id_names):
+        groups[ni].append(fid)
+    by_name = array("I")
+    name_starts = array("I", [0])
+    for group in groups:
+        by_name.extend(group)
+        name_starts.append(len(by_name))
+
+    blob, offsets = _pack_names(names)
+    folded, folded_offsets = _pack_names(n.lower() for n in names)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, 0 if sys.byteorder == "little" else 1,
+                             len(ids), len(names), len(blob), len(folded)))
+        for part in (ids, id_names, name_starts, by_name, offsets, folded_offsets):
+            f.write(part.tobytes())
+        f.write(blob)
+        f.write(folded)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(ids)
+
+
+def _pack_names(names: Iterable[str]) -> Tuple[bytes, array]:
+    """名称以 \\n 分隔拼接，offsets[i] 为第 i 个名称的起始字节（末尾多一项为总长）"""
+    parts = []
+    offsets = array("I", [0])
+    size = 0
+    for name in names:
+        data = name.encode("utf-8") + b"\n"
+        parts.append(data)
+        size += len(data)
+        offsets.append(size)
+    return b"".join(parts), offsets
+
+
+class FeatureCatalog:
+    """功能目录（只读，首次使用时才映射文件，不整体解析）"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else CATALOG_PATH
+        self._file = None
+        self._map = None
+        self._loaded = False
+        self.ids = self.id_names = self.name_starts = self.by_name = ()
+        self.offsets = self.folded_offsets = ()
+        self._names = self._folded = b""
+        self._name_cache: Dict[int, str] = {}
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            self._file = open(self.path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, order, count, name_count, blob_size, folded_size = _HEADER.unpack_from(self._map)
+        except (OSError, ValueError, struct.error):
+            self.close()
+            return
+        if magic != _MAGIC or version != _VERSION:
+            print(f"功能目录格式不兼容: {self.path}")
+            self.close()
+            return
+
+        view = memoryview(self._map)
+        swap = order != (0 if sys.byteorder == "little" else 1)
+        pos = _HEADER.size
+        sections = []
+        for length in (count, count, name_count + 1, count, name_count + 1, name_count + 1):
+            raw = view[pos:pos + length * 4]
+            if swap:
+                part = array("I", raw)
+                part.byteswap()
+            else:
+                # 直接在映射上按 uint32 读取，不复制
+                part = raw.cast("I")
+            sections.append(part)
+            pos += length * 4
+        self.ids, self.id_names, self.name_starts, self.by_name, self.offsets, self.folded_offsets = sections
+        self._names = view[pos:pos + blob_size]
+        self._folded = self._map
+        self._folded_base = pos + blob_size
+        self._folded_end = self._folded_base + folded_size
+
+    def close(self):
+        for part in (self.ids, self.id_names, self.name_starts, self.by_name, self.offsets, self.folded_offsets, self._names):
+            if isinstance(part, memoryview):
+                part.release()
+        self.ids = self.id_names = self.name_starts = self.by_name = ()
+        self.offsets = self.folded_offsets = ()
+        self._names = b""
+        self._folded = b""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        self._load()
+        return len(self.ids)
+
+    # ---------- 查找 ----------
+    def _name_at(self, index: int) -> str:
+        name = self._name_cache.get(index)
+        if name is None:
+            name = bytes(self._names[self.offsets[index]:self.offsets[index + 1] - 1]).decode("utf-8")
+            self._name_cache[index] = name = sys.intern(name)
+        return name
+
+    def _folded_at(self, index: int) -> bytes:
+        start = self._folded_base + self.folded_offsets[index]
+        end = self._folded_base + self.folded_offsets[index + 1] - 1
+        return self._folded[start:end]
+
+    def name(self, fid) -> Optional[str]:
+        """按 ID 查名称，未收录时为 None"""
+        self._load()
+        try:
+            fid = int(fid)
+        except (TypeError, ValueError):
+            return None
+        i = bisect_left(self.ids, fid)
+        if i == len(self.ids) or self.ids[i] != fid:
+            return None
+        return self._name_at(self.id_names[i])
+
+    def search(self, query: str, limit: int = CATALOG_SEARCH_LIMIT) -> List[Tuple[str, str]]:
+        """按输入搜索，返回 [(ID, 名称)]
+
+        纯数字时按 ID 前缀匹配；否则先列出名称以查询开头的，再补充名称包含查询的。
+        """
+        self._load()
+        query = query.strip()
+        if not query or not self.ids:
+            return []
+        if query.isdigit():
+            return [(str(fid), self._name_at(self.id_names[i])) for i, fid in self._id_prefix(query, limit)]
+
+        results: List[Tuple[str, str]] = []
+        seen = set()
+        for ni in self._name_prefix(query.lower().encode("utf-8")):
+            if self._collect(ni, results, seen, limit):
+                return results
+        for ni in self._name_substring(query.lower().encode("utf-8")):
+            if ni not in seen and self._collect(ni, results, seen, limit):
+                return results
+        return results
+
+    def _collect(self, ni: int, results: List[Tuple[str, str]], seen: set, limit: int) -> bool:
+        """加入第 ni 个名称下的所有 ID，够数时返回 True"""
+        seen.add(ni)
+        name = self._name_at(ni)
+        for j in range(self.name_starts[ni], self.name_starts[ni + 1]):
+            results.append((str(self.by_name[j]), name))
+            if len(results) >= limit:
+                return True
+        return False
+
+    def _id_prefix(self, prefix: str, limit: int) -> Iterator[Tuple[int, int]]:
+        """十进制前缀匹配的 ID：每种位数对应一段连续区间，逐段二分"""
+        count = 0
+        base = int(prefix)
+        for extra in range(0, 11 - len(prefix)):
+            low = base * 10 ** extra
+            high = (base + 1) * 10 ** extra
+            if prefix[0] == "0" or low > 0xFFFFFFFF:
+                break
+            for i in range(bisect_left(self.ids, low), bisect_left(self.ids, high)):
+                yield i, self.ids[i]
+                count += 1
+                if count >= limit:
+                    return
+
+    def _name_prefix(self, prefix: bytes) -> Iterator[int]:
+        """小写名称以 prefix 开头的名称序号（名称已按小写排序，二分定位区间）"""
+        count = len(self.folded_offsets) - 1
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._folded_at(mid) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        for ni in range(lo, count):
+            if not self._folded_at(ni).startswith(prefix):
+                break
+            yield ni
+
+    def _name_substring(self, needle: bytes) -> Iterator[int]:
+        """小写名称包含 needle 的名称序号：直接在映射上 find，再二分回名称序号"""
+        if b"\n" in needle:
+            return
+        pos = self._folded_base
+        while True:
+            hit = self._folded.find(needle, pos, self._folded_end)
+            if hit < 0:
+                return
+            ni = bisect_right(self.folded_offsets, hit - self._folded_base) - 1
+            yield ni
+            # 跳到下一个名称，同一名称只产出一次
+            pos = self._folded_base + self.folded_offsets[ni + 1]
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行：由功能字典文本生成目录文件"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the ViVeTool feature catalog")
+    parser.add_argument("sources", nargs="+", help="feature dictionary text files")
+    parser.add_argument("-o", "--output", default=str(CATALOG_PATH))
+    args = parser.parse_args(argv)
+
+    def entries():
+        for source in args.sources:
+            with open(source, "r", encoding="utf-8", errors="replace") as f:
+                yield from parse_catalog(f)
+
+    count = build_catalog(entries(), Path(args.output))
+    print(f"{count} features -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ViVeTool Manager v3.9 - 命令行模块
+无界面的命令行入口：不导入 tkinter，结果以 JSON 输出到标准输出，退出代码表示成败
+"""
+
+import sys
+import json
+import argparse
+import contextlib
+from typing import Dict, List, Optional
+
+from style import config
+from journal import Journal
+from featurestate import (
+    FeatureStates, parse_query,
+    STATE_ENABLED, STATE_DISABLED, RESULT_APPLIED, RESULT_ALREADY, RESULT_ERROR
+)
+from utils import (
+    is_admin, discover_vivetool, parse_version,
+    fingerprint_vivetool, is_fingerprint_valid,
+    resolve_vivetool_exe, run_command_captured, stream_command,
+    plan_batches, run_apply, BatchTuner,
+    parse_ids, iter_id_file, CommandError
+)
+
+
+# 退出代码
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_NOT_FOUND = 3
+
+# 失败的 ID 默认的重试间隔（秒，之后每次翻倍）
+CLI_RETRY_BACKOFF = 1.0
+
+
+class CliError(Exception):
+    """命令失败：带退出代码和错误信息"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+# ============== 公共步骤 ==============
+def resolve_path(path: Optional[str], save: bool = True) -> str:
+    """确定 ViVeTool 目录：命令行参数 > 已保存且指纹有效的路径 > 重新搜索"""
+    if path:
+        if not resolve_vivetool_exe(path):
+            raise CliError(EXIT_NOT_FOUND, f"vivetool.exe not found in {path}")
+        return path
+    saved = config.vivetool_path
+    if saved and is_fingerprint_valid(saved, config.vivetool_fingerprint) and resolve_vivetool_exe(saved):
+        return saved
+    installs = discover_vivetool()
+    if not installs:
+        raise CliError(EXIT_NOT_FOUND, "ViVeTool not found")
+    if save:
+        config.set_vivetool(installs[0], fingerprint_vivetool(installs[0]))
+    return installs[0]
+
+
+def collect_ids(ids: List[str], file: Optional[str] = None, profile: Optional[str] = None) -> List[str]:
+    """合并命令行 ID、文件和方案中的 ID（支持范围），保持顺序去重"""
+    chunks: List = [" ".join(ids)]
+    if file:
+        try:
+            chunks = [*chunks, *iter_id_file(file)]
+        except (OSError, ValueError) as e:
+            raise CliError(EXIT_USAGE, f"cannot read {file}: {e}")
+    stats: Dict[str, int] = {}
+    result = list(dict.fromkeys(parse_ids(chunks, stats)))
+    if profile:
+        if not config.profiles.exists(profile):
+            raise CliError(EXIT_USAGE, f"profile not found: {profile}")
+        result = list(dict.fromkeys(result + config.profiles.ids(profile)))
+    if stats.get("invalid"):
+        print(f"skipped {stats['invalid']} invalid IDs", file=sys.stderr)
+    return result
+
+
+def query_states(folder: str, ids: Optional[List[str]] = None) -> FeatureStates:
+    """执行 /query（分批）并解析为状态缓存；ids 为 None 时查询全部
+
+    /query 以非零退出代码结束时不采用该批输出，抛出 CliError。
+    """
+    exe = resolve_vivetool_exe(folder)
+    states = FeatureStates()
+    prefix = "vivetool /query /id:"
+    for batch in plan_batches(ids, len(prefix)) if ids else [None]:
+        args = [exe, "/query"] + (["/id:" + ",".join(batch)] if batch else [])
+        try:
+            states.load(parse_query(stream_command(args, folder)), batch)
+        except CommandError as e:
+            raise CliError(EXIT_FAILED, f"/query failed with {e}")
+    return states
+
+
+def apply_ids(folder: str, operation: str, ids: List[str], diff: bool = True, attempts: int = 1) -> dict:
+    """执行 /enable 或 /disable，返回包含每个 ID 结果的字典"""
+    exe = resolve_vivetool_exe(folder)
+    skipped: List[str] = []
+    if diff and ids:
+        target = STATE_ENABLED if operation == "enable" else STATE_DISABLED
+        try:
+            ids, skipped = query_states(folder, ids).diff(ids, target)
+        except CliError as e:
+            # 状态未知时照常发送全部 ID
+            print(f"{e}; sending all IDs", file=sys.stderr)
+
+    results = {fid: (RESULT_ALREADY, None) for fid in skipped}
+    code, output, duration = 0, "", 0.0
+    if ids:
+        prefix = "vivetool /" + operation + " /id:"
+        tuner = BatchTuner(config.batch_stats, ids, len(prefix))
+        batches = plan_batches(ids, len(prefix), max_ids=tuner.suggest())
+        (code, output, duration), sent = run_apply(
+            batches,
+            lambda batch: run_command_captured([exe, "/" + operation, "/id:" + ",".join(batch)], folder),
+            config.batch_in_flight,
+            attempts,
+            CLI_RETRY_BACKOFF,
+            on_progress=lambda index, total, batch, result: tuner.record(len(batch), result[2]),
+            on_retry=lambda attempt, total, count, delay: print(
+                f"attempt {attempt}/{total}: retrying {count} failed IDs in {delay:.0f}s", file=sys.stderr
+            ),
+        )
+        config.batch_stats = tuner.stats
+        results.update(sent)
+
+    failed = {fid: err for fid, (outcome, err) in results.items() if outcome == RESULT_ERROR}
+    summary = {name: 0 for name in (RESULT_APPLIED, RESULT_ALREADY, RESULT_ERROR)}
+    for outcome, _ in results.values():
+        summary[outcome] += 1
+
+    if ids:
+        journal = Journal()
+        extra = {"exit_code": code, "duration": round(duration, 3), "source": "cli"}
+        if failed:
+            extra["failed"] = failed
+        lines = output.strip().splitlines()
+        journal.record(operation, folder, ids, not failed, lines[-1] if failed and lines else "", **extra)
+        journal.close()
+
+    return {
+        "ok": not failed,
+        "operation": operation,
+        "path": folder,
+        "elevated": bool(is_admin()),
+        "exit_code": code,
+        "duration": round(duration, 3),
+        "sent": ids,
+        "skipped": skipped,
+        "summary": summary,
+        "results": {fid: {"result": outcome, "code": err} for fid, (outcome, err) in results.items()},
+    }
+
+
+# ============== 子命令 ==============
+def cmd_find(args) -> dict:
+    if args.path:
+        installs = [args.path] if resolve_vivetool_exe(args.path) else []
+    else:
+        installs = discover_vivetool()
+    if not installs:
+        raise CliError(EXIT_NOT_FOUND, "ViVeTool not found")
+    if args.save:
+        config.set_vivetool(installs[0], fingerprint_vivetool(installs[0]))
+    return {
+        "ok": True,
+        "path": installs[0],
+        "installs": [{"path": p, "version": ".".join(map(str, parse_version(p))) or None} for p in installs],
+    }
+
+
+def cmd_query(args) -> dict:
+    folder = resolve_path(args.path)
+    ids = collect_ids(args.ids, args.file, args.profile) if (args.ids or args.file or args.profile) else None
+    found = query_states(folder, ids).snapshot()
+    return {"ok": True, "path": folder, "states": {fid: found.get(fid) for fid in ids} if ids else found}
+
+
+def cmd_set(args) -> dict:
+    ids = collect_ids(args.ids, args.file, args.profile)
+    if not ids:
+        raise CliError(EXIT_USAGE, "no feature IDs given")
+    return apply_ids(resolve_path(args.path), args.command, ids, args.diff, args.attempts)
+
+
+def cmd_apply(args) -> dict:
+    if not args.file and not args.profile:
+        raise CliError(EXIT_USAGE, "apply needs --file or --profile")
+    ids = collect_ids([], args.file, args.profile)
+    if not ids:
+        raise CliError(EXIT_USAGE, "no feature IDs given")
+    return apply_ids(resolve_path(args.path), args.op, ids, args.diff, args.attempts)
+
+
+def cmd_profile(args) -> dict:
+    store = config.profiles
+    action = args.action
+    if action == "list":
+        return {
+            "ok": True,
+            "active": config.active_profile,
+            "profiles": [{"name": name, "count": store.count(name)} for name in store.names()],
+        }
+
+    name = args.name or config.active_profile
+    if action == "show":
+        if not store.exists(name):
+            raise CliError(EXIT_USAGE, f"profile not found: {name}")
+        return {"ok": True, "name": name, "ids": store.ids(name)}
+    if action == "use":
+        if not store.exists(name):
+            raise CliError(EXIT_USAGE, f"profile not found: {name}")
+        config.active_profile = name
+        return {"ok": True, "active": name, "count": store.count(name)}
+    if action == "create":
+        if not store.create(name, collect_ids(args.ids, args.file)):
+            raise CliError(EXIT_USAGE, f"profile already exists: {name}")
+        return {"ok": True, "name": name, "count": store.count(name)}
+    if action == "delete":
+        if len(store.names()) <= 1 and store.exists(name):
+            raise CliError(EXIT_USAGE, "at least one profile must remain")
+        if not store.delete(name):
+            raise CliError(EXIT_USAGE, f"profile not found: {name}")
+        if config.active_profile == name:
+            config.active_profile = store.names()[0]
+        return {"ok": True, "deleted": name, "active": config.active_profile}
+    if action == "add":
+        added = store.add(name, collect_ids(args.ids, args.file))
+        return {"ok": True, "name": name, "added": added, "count": store.count(name)}
+    if action == "remove":
+        removed = store.remove(name, collect_ids(args.ids, args.file))
+        return {"ok": True, "name": name, "removed": removed, "count": store.count(name)}
+    raise CliError(EXIT_USAGE, f"unknown action: {action}")
+
+
+# ============== 入口 ==============
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="ViVeTool Manager headless command line")
+    parser.add_argument("--path", help="ViVeTool folder (default: saved path or search)")
+    parser.add_argument("--indent", type=int, default=None, help="indent the JSON output")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("find", help="search for ViVeTool installs")
+    p.add_argument("--save", action="store_true", help="remember the newest install")
+    p.set_defaults(func=cmd_find)
+
+    def id_sources(p, profile=True):
+        p.add_argument("ids", nargs="*", help="feature IDs, ranges like 100-200 allowed")
+        p.add_argument("--file", help="text, CSV or JSON file with IDs")
+        if profile:
+            p.add_argument("--profile", help="add the IDs of a saved profile")
+
+    def run_options(p):
+        p.add_argument("--no-diff", dest="diff", action="store_false",
+                       help="send every ID, even those already in the target state")
+        p.add_argument("--attempts", type=int, default=1, help="tries per failed ID (default 1)")
+
+    p = sub.add_parser("query", help="query feature states")
+    id_sources(p)
+    p.set_defaults(func=cmd_query)
+
+    for name in ("enable", "disable"):
+        p = sub.add_parser(name, help=f"{name} feature IDs")
+        id_sources(p)
+        run_options(p)
+        p.set_defaults(func=cmd_set)
+
+    p = sub.add_parser("apply", help="apply an ID set from a file or profile")
+    p.add_argument("--file", help="text, CSV or JSON file with IDs")
+    p.add_argument("--profile", help="saved profile")
+    p.add_argument("--op", choices=("enable", "disable"), default="enable")
+    run_options(p)
+    p.set_defaults(func=cmd_apply)
+
+    p = sub.add_parser("profile", help="manage saved profiles")
+    p.add_argument("action", choices=("list", "show", "use", "create", "delete", "add", "remove"))
+    p.add_argument("name", nargs="?", help="profile name (default: active profile)")
+    id_sources(p, profile=False)
+    p.set_defaults(func=cmd_profile)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    out = sys.stdout
+    try:
+        # 工具函数的提示信息写到标准错误，标准输出只保留 JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            result = args.func(args)
+            code = EXIT_OK if result.get("ok") else EXIT_FAILED
+    except CliError as e:
+        result, code = {"ok": False, "error": str(e)}, e.code
+    except Exception as e:
+        result, code = {"ok": False, "error": f"{type(e).__name__}: {e}"}, EXIT_FAILED
+    finally:
+        config.flush()
+    json.dump(result, out, ensure_ascii=False, indent=args.indent)
+    out.write("\n")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ViVeTool Manager v3.9 - 功能状态模块
+流式解析 vivetool /query 输出，并按功能 ID 缓存当前状态；解析 /enable、/disable 的逐 ID 结果
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+STATE_DEFAULT = "default"
+STATE_DISABLED = "disabled"
+STATE_ENABLED = "enabled"
+
+_STATE_CODES = {0: STATE_DEFAULT, 1: STATE_DISABLED, 2: STATE_ENABLED}
+
+# /enable、/disable 的逐 ID 结果
+RESULT_APPLIED = "applied"
+RESULT_ALREADY = "already"
+RESULT_ERROR = "error"
+
+_HEADER_RE = re.compile(r"^\s*\[(\d+)\]\s*$")
+_NOT_FOUND_RE = re.compile(r"no configuration for feature id (\d+)", re.IGNORECASE)
+_CODE_RE = re.compile(r"\((\d+)\)")
+_ID_RE = re.compile(r"\b(\d+)\b")
+_ERROR_CODE_RE = re.compile(r"error code:?\s*(0x[0-9a-f]+|-?\d+)|\b(0x[0-9a-f]+)\b", re.IGNORECASE)
+
+
+def parse_query(lines: Iterable[str]) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """流式解析 /query 输出
+
+    每读完一个配置块就产出 (ID, 字段)，字段名为小写；
+    “No configuration for feature ID x” 产出 (x, {})。
+    输入可以是任意逐行产出的可迭代对象，不要求整体读入内存。
+    """
+    current = None
+    fields: Dict[str, str] = {}
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            if current is not None:
+                yield current, fields
+                current = None
+            continue
+        if stripped[0] == "[":
+            header = _HEADER_RE.match(stripped)
+            if header:
+                if current is not None:
+                    yield current, fields
+                current, fields = header.group(1), {}
+                continue
+        if current is not None:
+            key, sep, value = stripped.partition(":")
+            if sep and key:
+                fields[key.strip().lower()] = value.strip()
+                continue
+        missing = _NOT_FOUND_RE.search(stripped)
+        if missing:
+            if current is not None:
+                yield current, fields
+                current = None
+            yield missing.group(1), {}
+    if current is not None:
+        yield current, fields
+
+
+def parse_apply(lines: Iterable[str], ids: List[str], code: int) -> Dict[str, Tuple[str, Optional[str]]]:
+    """把一批 /enable、/disable 的输出解析为每个 ID 的 (结果, 错误代码)
+
+    提到具体 ID 的行按 “already” / “error”、“fail” 判断该 ID 的结果；
+    其余 ID 在退出代码为 0 或输出中有 “Successfully” 时记为已应用，否则记为失败，
+    错误代码取输出中的 0x… / “Error code: n”，没有时为退出代码。
+    """
+    wanted = set(ids)
+    results: Dict[str, Tuple[str, Optional[str]]] = {}
+    error_code = None
+    succeeded = False
+    for line in lines:
+        lower = line.lower()
+        failed = "error" in lower or "fail" in lower
+        succeeded = succeeded or lower.lstrip().startswith("success")
+        match = _ERROR_CODE_RE.search(line) if failed else None
+        line_code = (match.group(1) or match.group(2)) if match else None
+        mentioned = [fid for fid in _ID_RE.findall(line) if fid in wanted]
+        if not mentioned:
+            if failed and line_code and error_code is None:
+                error_code = line_code
+            continue
+        if "already" in lower:
+            result = (RESULT_ALREADY, None)
+        elif failed:
+            result = (RESULT_ERROR, line_code or str(code))
+        else:
+            result = (RESULT_APPLIED, None)
+        for fid in mentioned:
+            results[fid] = result
+    fallback = (RESULT_APPLIED, None) if code == 0 or succeeded else (RESULT_ERROR, error_code or str(code))
+    for fid in ids:
+        results.setdefault(fid, fallback)
+    return results
+
+
+def parse_state(value: Optional[str]) -> str:
+    """把 “Enabled (2)” 之类的字段值转换为状态名"""
+    if not value:
+        return STATE_DEFAULT
+    code = _CODE_RE.search(value)
+    if code and int(code.group(1)) in _STATE_CODES:
+        return _STATE_CODES[int(code.group(1))]
+    word = value.split()[0].lower()
+    return word if word in (STATE_ENABLED, STATE_DISABLED) else STATE_DEFAULT
+
+
+def _priority(fields: Dict[str, str]) -> int:
+    code = _CODE_RE.search(fields.get("priority", ""))
+    return int(code.group(1)) if code else 0
+
+
+class FeatureStates:
+    """功能状态缓存：ID -> 状态（线程安全）"""
+
+    def __init__(self):
+        self.states: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def load(self, records: Iterable[Tuple[str, Dict[str, str]]], ids: Optional[List[str]] = None) -> int:
+        """合并解析结果，返回更新的 ID 数
+
+        同一 ID 有多个配置块时以优先级最高的为准；
+        ids 为本次查询的 ID，其中没有任何配置块的记为默认状态。
+        """
+        best: Dict[str, Tuple[int, str]] = {}
+        for fid, fields in records:
+            priority = _priority(fields) if fields else -1
+            if fid not in best or priority > best[fid][0]:
+                best[fid] = (priority, parse_state(fields.get("state")))
+        for fid in ids or ():
+            best.setdefault(fid, (-1, STATE_DEFAULT))
+        with self._lock:
+            for fid, (_, state) in best.items():
+                self.states[fid] = state
+        return len(best)
+
+    def get(self, fid: str) -> Optional[str]:
+        with self._lock:
+            return self.states.get(fid)
+
+    def snapshot(self) -> Dict[str, str]:
+        """当前缓存的副本"""
+        with self._lock:
+            return dict(self.states)
+
+    def invalidate(self, ids: Iterable[str]):
+        """操作后使这些 ID 的状态失效"""
+        with self._lock:
+            for fid in ids:
+                self.states.pop(fid, None)
+
+    def diff(self, ids: Iterable[str], target: str) -> Tuple[List[str], List[str]]:
+        """拆分为 (需要发送的 ID, 已处于目标状态而跳过的 ID)；状态未知的一律发送"""
+        send, skipped = [], []
+        with self._lock:
+            for fid in ids:
+                (skipped if self.states.get(fid) == target else send).append(fid)
+        return send, skipped
+
+    def missing(self, ids: Iterable[str]) -> List[str]:
+        """尚无缓存状态的 ID"""
+        with self._lock:
+            return [fid for fid in ids if fid not in self.states]
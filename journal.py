@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ViVeTool Manager v3.9 - 操作日志模块
+只追加的 JSONL 操作记录，附带偏移索引和功能 ID 摘要，超过大小后压缩归档
+"""
+
+import os
+import json
+import time
+import queue
+import struct
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from logbuffer import LOG_DIR
+
+
+# 单个日志文件大小上限（字节），超过后压缩归档
+JOURNAL_MAX_BYTES = 4 * 1024 * 1024
+
+# 偏移索引：每条记录一个 8 字节无符号整数
+_OFFSET = struct.Struct("<Q")
+
+
+class Journal:
+    """操作日志（写入在后台线程中完成，不阻塞界面）"""
+
+    def __init__(self, directory: Optional[Path] = None, max_bytes: int = JOURNAL_MAX_BYTES):
+        self.directory = Path(directory) if directory else LOG_DIR
+        self.max_bytes = max_bytes
+        self.path = self.directory / "journal.jsonl"
+        self.index_path = self.directory / "journal.idx"
+        self.ids_path = self.directory / "journal.ids.json"
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._ids = None
+
+    # ---------- 写入 ----------
+    def record(self, operation: str, vivetool_path: str, ids: List[str], success: bool, message: str = "", **extra):
+        """记录一次操作（立即返回）"""
+        entry = {
+            "ts": round(time.time(), 3),
+            "op": operation,
+            "path": vivetool_path,
+            "ids": list(ids),
+            "result": "success" if success else "error",
+            "message": message,
+        }
+        entry.update(extra)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, daemon=True)
+            self._thread.start()
+        self._queue.put(entry)
+
+    def flush(self):
+        """等待所有记录写入磁盘"""
+        if self._thread is not None:
+            self._queue.join()
+
+    close = flush
+
+    def _writer(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while True:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                with self._lock:
+                    self._write_batch(batch)
+            except Exception as e:
+                print(f"写入操作日志失败: {e}")
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_batch(self, batch: List[dict]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        ids = self._load_ids()
+        offsets = []
+        with open(self.path, "ab") as f:
+            for entry in batch:
+                offsets.append(f.tell())
+                f.write(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+                # 部分失败的操作带有逐 ID 的 failed，其余 ID 已生效；整体失败且无逐 ID 结果时不记录
+                if entry["result"] == "success" or "failed" in entry:
+                    failed = entry.get("failed", {})
+                    for fid in entry["ids"]:
+                        if fid not in failed:
+                            ids.setdefault(fid, {})[entry["op"]] = entry["ts"]
+            size = f.tell()
+        with open(self.index_path, "ab") as f:
+            f.write(b"".join(_OFFSET.pack(o) for o in offsets))
+
+        tmp = self.ids_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(ids, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.ids_path)
+
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        """压缩归档当前日志，并清空偏移索引"""
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        # 同一秒内多次归档时追加序号，保证文件名按时间排序
+        n = 0
+        archive = self.directory / f"journal-{stamp}-{n:03d}.jsonl.gz"
+        while archive.exists():
+            n += 1
+            archive = self.directory / f"journal-{stamp}-{n:03d}.jsonl.gz"
+        # 归档很少发生，gzip/shutil 用到时才导入
+        import gzip
+        import shutil
+        with open(self.path, "rb") as src, gzip.open(archive, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(self.path)
+        os.remove(self.index_path)
+
+    # ---------- 查询 ----------
+    def _load_ids(self) -> dict:
+        if self._ids is None:
+            try:
+                with open(self.ids_path, "r", encoding="utf-8") as f:
+                    self._ids = json.load(f)
+            except (OSError, ValueError):
+                self._ids = {}
+        return self._ids
+
+    def last_changed(self, feature_id: str, operation: str = "enable") -> Optional[float]:
+        """某个功能 ID 最近一次成功执行指定操作的时间戳"""
+        with self._lock:
+            return self._load_ids().get(feature_id, {}).get(operation)
+
+    def last(self, count: int = 50) -> List[dict]:
+        """最近的若干条操作记录（从旧到新），只读取文件末尾"""
+        with self._lock:
+            entries = self._tail_active(count)
+            if len(entries) < count:
+                import gzip
+                for archive in sorted(self.directory.glob("journal-*.jsonl.gz"), reverse=True):
+                    with gzip.open(archive, "rt", encoding="utf-8") as f:
+                        older = [json.loads(line) for line in f if line.strip()]
+                    entries = older[-(count - len(entries)):] + entries
+                    if len(entries) >= count:
+                        break
+            return entries
+
+    def _tail_active(self, count: int) -> List[dict]:
+        try:
+            with open(self.index_path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                total = f.tell() // _OFFSET.size
+                if total == 0:
+                    return []
+                f.seek((total - min(count, total)) * _OFFSET.size)
+                (start,) = _OFFSET.unpack(f.read(_OFFSET.size))
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                return [json.loads(line) for line in f.read().splitlines() if line.strip()]
+        except (OSError, ValueError):
+            return []
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ViVeTool Manager v3.9 - 日志缓冲模块
+固定容量的内存环形缓冲区，被挤出的日志写入滚动的磁盘文件
+"""
+
+import os
+import re
+import time
+import threading
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+# 内存中保留的日志条数
+LOG_CAPACITY = 5000
+# 磁盘日志单个文件大小上限（字节）与保留的历史文件数
+LOG_SPILL_BYTES = 1024 * 1024
+LOG_SPILL_BACKUPS = 3
+
+LOG_DIR = Path(__file__).parent / "logs"
+
+_UNESCAPE_RE = re.compile(r"\\(.)")
+# 英文单词、数字（功能 ID）整体为一个词，中文按单字切分
+_TOKEN_RE = re.compile(r"[0-9a-z_]+|[\u4e00-\u9fff]")
+
+
+def tokenize(text: str) -> List[str]:
+    """切分日志文本为索引词"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class LogRecord:
+    """单条日志"""
+    __slots__ = ("seq", "time", "level", "message")
+
+    def __init__(self, seq: int, time: float, level: str, message: str):
+        self.seq = seq
+        self.time = time
+        self.level = level
+        self.message = message
+
+    def to_line(self) -> str:
+        message = self.message.replace("\\", "\\\\").replace("\n", "\\n")
+        return f"{self.seq}\t{self.time:.3f}\t{self.level}\t{message}\n"
+
+    @classmethod
+    def from_line(cls, line: str) -> Optional["LogRecord"]:
+        try:
+            seq, ts, level, message = line.rstrip("\n").split("\t", 3)
+            message = _UNESCAPE_RE.sub(lambda m: "\n" if m.group(1) == "n" else m.group(1), message)
+            return cls(int(seq), float(ts), level, message)
+        except ValueError:
+            return None
+
+
+class LogIndex:
+    """日志倒排索引：词 -> 记录序号（升序的紧凑数组）
+
+    磁盘上最旧的文件被滚动覆盖时由 prune 删除已无法取回的序号，内存占用随磁盘保留量封顶。
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, array] = {}
+
+    def add(self, record: LogRecord):
+        for token in set(tokenize(record.message)):
+            self._posting(token).append(record.seq)
+        self._posting("level:" + record.level).append(record.seq)
+
+    def prune(self, min_seq: int):
+        """删除序号小于 min_seq 的记录（已无法取回），清掉空的倒排表"""
+        for token in list(self._postings):
+            posting = self._postings[token]
+            i = bisect_left(posting, min_seq)
+            if i == len(posting):
+                del self._postings[token]
+            elif i:
+                del posting[:i]
+
+    def _posting(self, token: str) -> array:
+        posting = self._postings.get(token)
+        if posting is None:
+            posting = self._postings[token] = array("q")
+        return posting
+
+    def search(self, query: str, level: Optional[str] = None, limit: Optional[int] = None) -> List[int]:
+        """返回同时包含所有查询词（且级别匹配）的记录序号，升序；limit 限制只取最近的若干条"""
+        keys = list(dict.fromkeys(tokenize(query)))
+        if level:
+            keys.append("level:" + level)
+        if not keys:
+            return []
+        postings = [self._postings.get(k) for k in keys]
+        if any(p is None for p in postings):
+            return []
+        postings.sort(key=len)
+        first, others = postings[0], postings[1:]
+        if not others:
+            return list(first[-limit:] if limit else first)
+
+        # 从最新的记录往回遍历最短的倒排表，够数即停
+        result = []
+        for seq in reversed(first):
+            for other in others:
+                i = bisect_left(other, seq)
+                if i == len(other) or other[i] != seq:
+                    break
+            else:
+                result.append(seq)
+                if limit and len(result) >= limit:
+                    break
+        result.reverse()
+        return result
+
+
+class LogBuffer:
+    """环形日志缓冲区（线程安全）"""
+
+    def __init__(self, capacity: int = LOG_CAPACITY, spill_path: Optional[Path] = None,
+                 max_bytes: int = LOG_SPILL_BYTES, backups: int = LOG_SPILL_BACKUPS):
+        self.capacity = capacity
+        self.spill_path = Path(spill_path) if spill_path else LOG_DIR / "vivetool.log"
+        self.max_bytes = max_bytes
+        self.backups = backups
+        # 序号接续磁盘上的历史，跨会话翻页时保持有序
+        self.next_seq = self._last_spilled_seq() + 1
+        self._records: List[Optional[LogRecord]] = [None] * capacity
+        self._start = 0
+        self._count = 0
+        self._spill = None
+        self._lock = threading.Lock()
+        self.index = LogIndex()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, message: str, level: str = "info") -> LogRecord:
+        """追加一条日志，缓冲区已满时最旧的一条写入磁盘"""
+        with self._lock:
+            record = LogRecord(self.next_seq, time.time(), level, message)
+            self.next_seq += 1
+            self.index.add(record)
+            if self._count < self.capacity:
+                self._records[(self._start + self._count) % self.capacity] = record
+                self._count += 1
+            else:
+                self._write_spill(self._records[self._start])
+                self._records[self._start] = record
+                self._start = (self._start + 1) % self.capacity
+            return record
+
+    def recent(self, count: int) -> List[LogRecord]:
+        """最近的若干条日志（从旧到新）"""
+        with self._lock:
+            count = min(count, self._count)
+            first = self._start + self._count - count
+            return [self._records[(first + i) % self.capacity] for i in range(count)]
+
+    def before(self, seq: int, count: int) -> List[LogRecord]:
+        """序号小于 seq 的最近若干条日志（从旧到新），内存中不够时从磁盘读取"""
+        with self._lock:
+            memory = [self._records[(self._start + i) % self.capacity] for i in range(self._count)]
+            memory = [r for r in memory if r.seq < seq]
+            result = memory[-count:]
+            if len(result) < count:
+                oldest = result[0].seq if result else seq
+                if self._spill is not None:
+                    self._spill.flush()
+                result = self._read_spill(oldest, count - len(result)) + result
+            return result
+
+    def search(self, query: str, level: Optional[str] = None, limit: Optional[int] = None) -> List[int]:
+        """按关键词和级别检索日志序号"""
+        with self._lock:
+            return self.index.search(query, level, limit)
+
+    def get(self, seqs: Iterable[int]) -> List[LogRecord]:
+        """按序号取日志记录（从旧到新），不在内存中的从磁盘读取"""
+        with self._lock:
+            wanted = set(seqs)
+            found = {}
+            for i in range(self._count):
+                record = self._records[(self._start + i) % self.capacity]
+                if record.seq in wanted:
+                    found[record.seq] = record
+            missing = wanted.difference(found)
+            if missing:
+                if self._spill is not None:
+                    self._spill.flush()
+                for path in self._spill_files():
+                    try:
+                        with open(path, "r", encoding="utf-8") as f:
+                            for line in f:
+                                seq = line.split("\t", 1)[0]
+                                if seq.isdigit() and int(seq) in missing:
+                                    found[int(seq)] = LogRecord.from_line(line)
+                    except OSError:
+                        continue
+            return [found[seq] for seq in sorted(found)]
+
+    def clear(self):
+        """清空内存中的日志（先写入磁盘，仍可翻页找回）"""
+        with self._lock:
+            self._spill_all()
+
+    def close(self):
+        """退出时将内存中的日志全部写入磁盘"""
+        with self._lock:
+            self._spill_all()
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+
+    # ---------- 磁盘文件 ----------
+    def _spill_files(self) -> List[Path]:
+        """磁盘日志文件，从新到旧"""
+        files = [self.spill_path]
+        files += [self.spill_path.with_name(f"{self.spill_path.name}.{i}") for i in range(1, self.backups + 1)]
+        return [f for f in files if f.exists()]
+
+    def _spill_all(self):
+        for i in range(self._count):
+            self._write_spill(self._records[(self._start + i) % self.capacity])
+        self._records = [None] * self.capacity
+        self._start = 0
+        self._count = 0
+
+    def _last_spilled_seq(self) -> int:
+        for path in self._spill_files():
+            try:
+                with open(path, "rb") as f:
+                    f.seek(0, os.SEEK_END)
+                    f.seek(max(0, f.tell() - 4096))
+                    lines = f.read().decode("utf-8", "ignore").splitlines()
+            except OSError:
+                continue
+            for line in reversed(lines):
+                record = LogRecord.from_line(line)
+                if record is not None:
+                    return record.seq
+        return -1
+
+    def _write_spill(self, record: LogRecord):
+        try:
+            if self._spill is None:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                self._spill = open(self.spill_path, "a", encoding="utf-8")
+            self._spill.write(record.to_line())
+            if self._spill.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            print(f"写入日志文件失败: {e}")
+
+    def _rotate(self):
+        self._spill.close()
+        self._spill = None
+        for i in range(self.backups, 0, -1):
+            src = self.spill_path if i == 1 else self.spill_path.with_name(f"{self.spill_path.name}.{i - 1}")
+            if src.exists():
+                os.replace(src, self.spill_path.with_name(f"{self.spill_path.name}.{i}"))
+        # 最旧的文件已被覆盖：索引只保留仍能从磁盘或内存取回的记录
+        self.index.prune(self._first_spilled_seq())
+
+    def _first_spilled_seq(self) -> int:
+        """磁盘上仍保留的最旧记录的序号，没有磁盘文件时为内存中最旧的一条"""
+        for path in reversed(self._spill_files()):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        record = LogRecord.from_line(line)
+                        if record is not None:
+                            return record.seq
+            except OSError:
+                continue
+        return self._records[self._start].seq if self._count else self.next_seq
+
+    def _read_spill(self, seq: int, count: int) -> List[LogRecord]:
+        result: List[LogRecord] = []
+        for path in self._spill_files():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    records = [LogRecord.from_line(line) for line in f]
+            except OSError:
+                continue
+            records = [r for r in records if r is not None and r.seq < seq]
+            result = records[-(count - len(result)):] + result
+            if len(result) >= count:
+                break
+        return result
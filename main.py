@@ -6,24 +6,94 @@ ViVeTool Manager v3.9 - 主程序
 
 import os
 import sys
+import time
+import queue
+import threading
+from collections import deque
 from pathlib import Path
 
 from style import config, Style, Font, DEFAULT_IDS
+from logbuffer import LogBuffer, tokenize
+from journal import Journal
+from catalog import FeatureCatalog
+from spans import span, tracer
+from featurestate import (
+    FeatureStates, parse_query,
+    STATE_ENABLED, STATE_DISABLED, RESULT_APPLIED, RESULT_ALREADY, RESULT_ERROR
+)
 from utils import (
-    is_admin, run_as_admin, find_vivetool,
+    is_admin, run_as_admin, iter_vivetool, parse_version,
+    rank_installs, DirectoryWatcher,
     run_command_admin, validate_id, format_ids,
-    get_default_ids, restart_pc
+    get_default_ids, restart_pc, LazyModule,
+    fingerprint_vivetool, is_fingerprint_valid,
+    resolve_vivetool_exe, run_command_captured,
+    plan_batches, run_apply, BatchTuner, stream_command, CommandError,
+    parse_ids, iter_id_file
 )
 
 try:
     import tkinter as tk
-    from tkinter import ttk, messagebox, filedialog, scrolledtext
-    import ctypes
+    from tkinter import ttk, scrolledtext
 except ImportError:
     print("错误：tkinter未安装。请安装Python后重试。")
     input("按回车键退出...")
     sys.exit(1)
 
+# 对话框模块在第一次弹出对话框时才导入（按名称导入，打包时需列在 main.spec 的 hiddenimports 中）
+messagebox = LazyModule("tkinter.messagebox")
+filedialog = LazyModule("tkinter.filedialog")
+simpledialog = LazyModule("tkinter.simpledialog")
+
+
+# 后台搜索结果轮询间隔（毫秒）
+SEARCH_POLL_MS = 50
+
+# 日志批量写入间隔（毫秒）：有待写日志时约一帧，空闲时放慢
+LOG_FLUSH_MS = 16
+LOG_IDLE_MS = 100
+# 每批最多写入的日志行数
+LOG_BATCH_LINES = 500
+# 日志框中保留的行数，以及每次向前翻页加载的条数
+LOG_VIEW_LINES = 1000
+LOG_PAGE_LINES = 200
+# 日志搜索输入防抖（毫秒）与可筛选的级别
+LOG_SEARCH_DELAY_MS = 150
+LOG_LEVELS = ["info", "success", "warning", "error"]
+
+# 计时面板显示的区间名称数，以及打开时的刷新间隔（毫秒）
+SPAN_PANEL_ROWS = 8
+SPAN_REFRESH_MS = 500
+
+# 窗口迟迟没有绘制（例如以最小化方式启动）时，最多等这么久就开始构建其余面板（毫秒）
+FIRST_PAINT_TIMEOUT_MS = 1000
+
+# ID列表可见行数（文本框里只保留这几行）
+IDS_VISIBLE_ROWS = 6
+
+# 确认对话框和日志中最多列出的 ID 数，其余只显示数量
+IDS_PREVIEW_COUNT = 20
+
+# 功能目录搜索建议的最多条数
+SUGGEST_LIMIT = 50
+
+# “重试失败项”的最多尝试次数，以及第一次重试前的等待（秒，之后每次翻倍）
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 1.0
+
+
+def _tk_len(text):
+    """Tk 文本索引长度（Tcl 8.6 中 BMP 以外的字符占两个位置）"""
+    return len(text) + sum(1 for c in text if ord(c) > 0xFFFF)
+
+
+def preview_ids(ids, sep):
+    """列出前 IDS_PREVIEW_COUNT 个 ID，其余显示为“… 以及另外 n 个”"""
+    shown = sep.join(ids[:IDS_PREVIEW_COUNT])
+    if len(ids) > IDS_PREVIEW_COUNT:
+        shown += sep + config.get("ids_more").format(count=len(ids) - IDS_PREVIEW_COUNT)
+    return shown
+
 
 class ViveToolApp:
     """ViVeTool Manager 主窗口"""
@@ -31,28 +101,98 @@ class ViveToolApp:
     def __init__(self, root):
         self.root = root
         self.vivetool_path = None
-        self.current_ids = config.feature_ids.copy()
+        # 当前方案的 ID（构建功能面板时才从方案存储读取）
+        self.current_ids = []
+        # 与有序列表同步的集合，去重时不必扫描列表
+        self.current_id_set = set()
+        
+        # 日志：环形缓冲区保存记录，日志框只显示最近的一段
+        self.log_buffer = LogBuffer()
+        self.log_pending = deque()
+        self.log_view = deque()
+        self.log_view_lines = 0
+        self.log_view_limit = LOG_VIEW_LINES
+        self.log_filtering = False
+        self.log_filter_job = None
+        
+        # 操作记录
+        self.journal = Journal()
+        
+        # 后台任务完成队列：(回调, 结果)
+        self.task_queue = queue.Queue()
+        self.tasks_running = 0
+        
+        # 提权代理（代理模式下首次执行时启动）
+        self.broker = None
+        
+        # 功能状态缓存（来自 vivetool /query）
+        self.feature_states = FeatureStates()
+        # ID列表的虚拟化显示：首个可见行的下标、当前显示的行 [(文本, 标签)]
+        self.ids_first = 0
+        self.ids_rows = []
+        self.ids_rows_first = 0
+        
+        # 功能目录（ID -> 名称，首次查询时才映射文件）
+        self.catalog = FeatureCatalog()
+        self.catalog_matches = []
+        
+        # 上次执行中每个 ID 的结果：ID -> (结果, 错误代码)
+        self.apply_results = {}
+        self.last_operation = None
+        
+        # 后台搜索状态：结果队列、当前搜索的取消事件和代号
+        self.search_queue = queue.Queue()
+        self.search_cancel = None
+        self.search_token = 0
+        self.search_manual = False
+        self.search_results = []
+        
+        # 未找到时监视下载目录
+        self.watcher = None
+        self.watch_job = None
         
         # 所有需要刷新UI的组件引用
         self.ui_components = {}
+        # 翻译登记表：组件 -> {选项: 翻译键或返回文本的函数}
+        self.translations = {}
+        
+        # 分步构建：首帧之后逐个构建的面板，以及启动各阶段的时刻（perf_counter）
+        self.pending_panels = deque()
+        self.ui_ready = False
+        self.startup_times = {"init": time.perf_counter()}
         
         self.setup_window()
         self.setup_styles()
         self.create_ui()
         self.init_app()
     
+    @span("setup_window")
     def setup_window(self):
         """设置窗口"""
         self.root.title(config.get("title"))
         self.root.geometry("1080x720")
         self.root.minsize(700, 600)
         self.root.configure(bg=Style.BG_DARK)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         try:
+            import ctypes
             ctypes.windll.shcore.SetProcessDpiAwareness(1)
         except Exception as e:
             self.log(f"设置DPI Awareness失败: {e}", "warning")
     
+    def on_close(self):
+        """关闭窗口：保存配置和日志后退出（配置写盘统计记入磁盘日志）"""
+        config.flush()
+        self.log_buffer.append(self.config_writes_text(), "info")
+        self.log_buffer.close()
+        self.catalog.close()
+        self.journal.close()
+        config.profiles.close()
+        if self.broker is not None:
+            self.broker.shutdown()
+        self.root.destroy()
+    
     def setup_styles(self):
         """配置样式"""
         self.style = ttk.Style()
@@ -63,8 +203,9 @@ class ViveToolApp:
         self.style.configure("TLabel", background=Style.BG_DARK, foreground=Style.TEXT_WHITE)
         self.style.configure("TButton", font=Font.BUTTON, foreground=Style.TEXT_WHITE)
     
+    @span("create_ui")
     def create_ui(self):
-        """创建界面"""
+        """创建界面骨架：标题栏和状态栏立即创建，其余面板在首帧绘制后逐个构建"""
         # 主容器
         main = tk.Frame(self.root, bg=Style.BG_DARK, padx=20, pady=15)
         main.pack(fill=tk.BOTH, expand=True)
@@ -84,21 +225,18 @@ class ViveToolApp:
         right_panel = tk.Frame(content, bg=Style.BG_DARK, width=350)
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH)
         
-        # 配置区域
-        self.create_config_panel(left_panel)
-        
-        # 功能区域
-        self.create_features_panel(left_panel)
-        
-        # 操作按钮
-        self.create_action_panel(left_panel)
-        
-        # 日志区域
-        self.create_log_panel(right_panel)
-        
         # 状态栏
         self.create_status_bar(main)
+        
+        # 配置区域、功能区域、操作按钮、日志区域：按顺序在空闲回调中构建
+        self.pending_panels.extend([
+            lambda: self.create_config_panel(left_panel),
+            lambda: self.create_features_panel(left_panel),
+            lambda: self.create_action_panel(left_panel),
+            lambda: self.create_log_panel(right_panel),
+        ])
     
+    @span("create_header")
     def create_header(self, parent):
         """创建标题栏"""
         header = tk.Frame(parent, bg=Style.BG_DARK)
@@ -107,17 +245,16 @@ class ViveToolApp:
         # 标题
         self.ui_components['title'] = tk.Label(
             header,
-            text="✨ " + config.get("title") + " " + config.get("version"),
             font=Font.TITLE,
             bg=Style.BG_DARK,
             fg=Style.PRIMARY
         )
+        self.translate(self.ui_components['title'], lambda: "✨ " + config.get("title") + " " + config.get("version"))
         self.ui_components['title'].pack(side=tk.LEFT)
         
         # 语言切换按钮
         self.ui_components['lang_btn'] = tk.Button(
             header,
-            text=config.get("btn_lang"),
             font=Font.BODY,
             bg=Style.BG_CARD,
             fg=Style.PRIMARY,
@@ -128,8 +265,11 @@ class ViveToolApp:
             command=self.toggle_language,
             cursor="hand2"
         )
+        # 显示下一种语言的名称
+        self.translate(self.ui_components['lang_btn'], lambda: config.languages[config.next_language()])
         self.ui_components['lang_btn'].pack(side=tk.RIGHT)
     
+    @span("create_config_panel")
     def create_config_panel(self, parent):
         """创建配置面板"""
         # 卡片容器
@@ -142,11 +282,11 @@ class ViveToolApp:
         # 标题
         self.ui_components['config_title'] = tk.Label(
             inner,
-            text=config.get("config_title"),
             font=Font.SUBTITLE,
             bg=Style.BG_CARD,
             fg=Style.PRIMARY
         )
+        self.translate(self.ui_components['config_title'], "config_title")
         self.ui_components['config_title'].pack(anchor=tk.W, pady=(0, 10))
         
         # 路径行
@@ -155,13 +295,13 @@ class ViveToolApp:
         
         self.ui_components['path_label'] = tk.Label(
             path_row,
-            text=config.get("path_label"),
             font=Font.BODY,
             bg=Style.BG_CARD,
             fg=Style.TEXT_GRAY,
             width=16,
             anchor=tk.W
         )
+        self.translate(self.ui_components['path_label'], "path_label")
         self.ui_components['path_label'].pack(side=tk.LEFT)
         
         self.path_var = tk.StringVar(value=config.get("path_searching"))
@@ -182,11 +322,19 @@ class ViveToolApp:
         btn_row = tk.Frame(inner, bg=Style.BG_CARD)
         btn_row.pack(fill=tk.X, pady=(8, 0))
         
-        self.ui_components['search_btn'] = self.create_tech_button(btn_row, config.get("btn_search"), self.search)
-        self.ui_components['browse_btn'] = self.create_tech_button(btn_row, config.get("btn_browse"), self.browse, secondary=True)
+        self.ui_components['search_btn'] = self.create_tech_button(
+            btn_row,
+            lambda: config.get("btn_cancel_search" if self.search_cancel is not None else "btn_search"),
+            self.search
+        )
+        self.ui_components['browse_btn'] = self.create_tech_button(btn_row, "btn_browse", self.browse, secondary=True)
     
+    @span("create_features_panel")
     def create_features_panel(self, parent):
         """创建功能面板"""
+        self.current_ids = config.feature_ids
+        self.current_id_set = set(self.current_ids)
+        
         card = tk.Frame(parent, bg=Style.BG_CARD, bd=1, relief=tk.SOLID)
         card.pack(fill=tk.X, pady=(0, 10))
         
@@ -196,26 +344,65 @@ class ViveToolApp:
         # 标题
         self.ui_components['features_title'] = tk.Label(
             inner,
-            text=config.get("features_title"),
             font=Font.SUBTITLE,
             bg=Style.BG_CARD,
             fg=Style.PRIMARY
         )
+        self.translate(
+            self.ui_components['features_title'],
+            lambda: config.get("features_title") + "  (" + str(len(self.current_ids)) + ")"
+        )
         self.ui_components['features_title'].pack(anchor=tk.W, pady=(0, 10))
         
-        # 当前列表
+        # 方案行
+        profile_row = tk.Frame(inner, bg=Style.BG_CARD)
+        profile_row.pack(fill=tk.X, pady=(0, 8))
+        
+        self.ui_components['profile_label'] = tk.Label(
+            profile_row,
+            font=Font.BODY,
+            bg=Style.BG_CARD,
+            fg=Style.TEXT_GRAY
+        )
+        self.translate(self.ui_components['profile_label'], "profile_label")
+        self.ui_components['profile_label'].pack(side=tk.LEFT)
+        
+        self.profile_var = tk.StringVar(value=config.active_profile)
+        self.ui_components['profile_box'] = ttk.Combobox(
+            profile_row,
+            textvariable=self.profile_var,
+            values=config.profiles.names(),
+            state="readonly",
+            width=16
+        )
+        self.ui_components['profile_box'].pack(side=tk.LEFT, padx=(8, 5))
+        self.ui_components['profile_box'].bind('<<ComboboxSelected>>', lambda e: self.switch_profile(self.profile_var.get()))
+        self.ui_components['new_profile_btn'] = self.create_tech_button(profile_row, "btn_new_profile", self.new_profile, secondary=True, small=True)
+        self.ui_components['delete_profile_btn'] = self.create_tech_button(profile_row, "btn_delete_profile", self.delete_profile, secondary=True, small=True)
+        
+        # 当前列表（虚拟化：文本框里只有可见的几行，滚动条按整个列表计算）
+        list_frame = tk.Frame(inner, bg=Style.BG_CARD)
+        list_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.ids_scroll = tk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.scroll_ids)
+        self.ids_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        
         self.ids_text = tk.Text(
-            inner,
-            height=6,
+            list_frame,
+            height=IDS_VISIBLE_ROWS,
             font=Font.LOG,
-            wrap=tk.WORD,
+            wrap=tk.NONE,
             bg=Style.BG_INPUT,
             fg=Style.SUCCESS,
             state="disabled",
             relief=tk.FLAT,
             bd=0
         )
-        self.ids_text.pack(fill=tk.X, pady=(0, 10))
+        self.ids_text.tag_config("error", foreground=Style.ERROR)
+        self.ids_text.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.ids_text.bind('<MouseWheel>', lambda e: self.scroll_ids("scroll", -1 if e.delta > 0 else 1, "units"))
+        self.ids_text.bind('<Button-4>', lambda e: self.scroll_ids("scroll", -1, "units"))
+        self.ids_text.bind('<Button-5>', lambda e: self.scroll_ids("scroll", 1, "units"))
         
         # 添加行
         add_row = tk.Frame(inner, bg=Style.BG_CARD)
@@ -223,11 +410,11 @@ class ViveToolApp:
         
         self.ui_components['feature_id_label'] = tk.Label(
             add_row,
-            text=config.get("feature_id_label"),
             font=Font.BODY,
             bg=Style.BG_CARD,
             fg=Style.TEXT_GRAY
         )
+        self.translate(self.ui_components['feature_id_label'], "feature_id_label")
         self.ui_components['feature_id_label'].pack(side=tk.LEFT)
         
         self.custom_id_var = tk.StringVar()
@@ -241,16 +428,42 @@ class ViveToolApp:
             bd=0
         )
         self.ui_components['custom_id_entry'].pack(side=tk.LEFT, padx=(8, 5))
+        self.ui_components['import_btn'] = self.create_tech_button(add_row, "btn_import", self.import_file, secondary=True, small=True)
+        self.ui_components['paste_btn'] = self.create_tech_button(add_row, "btn_paste", self.import_clipboard, secondary=True, small=True)
         self.ui_components['custom_id_entry'].bind('<Return>', lambda e: self.add_id())
+        self.ui_components['custom_id_entry'].bind('<KeyRelease>', self.suggest_features)
+        self.ui_components['custom_id_entry'].bind('<Down>', lambda e: self.focus_suggestions())
+        
+        # 功能目录搜索建议（输入时显示，没有匹配时隐藏）
+        self.suggest_list = tk.Listbox(
+            inner,
+            height=5,
+            font=Font.LOG,
+            bg=Style.BG_INPUT,
+            fg=Style.TEXT_WHITE,
+            selectbackground=Style.PRIMARY,
+            activestyle="none",
+            relief=tk.FLAT,
+            bd=0,
+            highlightthickness=0
+        )
+        self.suggest_list.bind('<Double-Button-1>', lambda e: self.pick_suggestion())
+        self.suggest_list.bind('<Return>', lambda e: self.pick_suggestion())
+        self.suggest_list.bind('<Escape>', lambda e: self.hide_suggestions())
+        self.suggest_anchor = add_row
         
         # 按钮行
         btn_row = tk.Frame(inner, bg=Style.BG_CARD)
         btn_row.pack(fill=tk.X, pady=(8, 0))
         
-        self.ui_components['add_btn'] = self.create_tech_button(btn_row, config.get("btn_add"), self.add_id)
-        self.ui_components['clear_btn'] = self.create_tech_button(btn_row, config.get("btn_clear"), self.clear_ids, secondary=True)
-        self.ui_components['default_btn'] = self.create_tech_button(btn_row, config.get("btn_default"), self.restore_default, secondary=True)
+        self.ui_components['add_btn'] = self.create_tech_button(btn_row, "btn_add", self.add_id)
+        self.ui_components['clear_btn'] = self.create_tech_button(btn_row, "btn_clear", self.clear_ids, secondary=True)
+        self.ui_components['default_btn'] = self.create_tech_button(btn_row, "btn_default", self.restore_default, secondary=True)
+        self.ui_components['query_btn'] = self.create_tech_button(btn_row, "btn_query", self.query_states, secondary=True)
+        self.ui_components['retry_btn'] = self.create_tech_button(btn_row, "btn_retry", self.retry_failed, warning=True)
+        self.ui_components['retry_btn'].config(state=tk.DISABLED)
     
+    @span("create_action_panel")
     def create_action_panel(self, parent):
         """创建操作按钮面板"""
         btn_frame = tk.Frame(parent, bg=Style.BG_DARK)
@@ -259,7 +472,7 @@ class ViveToolApp:
         # 启用按钮
         self.ui_components['enable_btn'] = self.create_tech_button(
             btn_frame,
-            config.get("btn_enable"),
+            "btn_enable",
             self.enable,
             success=True,
             expand=True
@@ -269,13 +482,32 @@ class ViveToolApp:
         # 禁用按钮
         self.ui_components['disable_btn'] = self.create_tech_button(
             btn_frame,
-            config.get("btn_disable"),
+            "btn_disable",
             self.disable,
             error=True,
             expand=True
         )
         self.ui_components['disable_btn'].config(state=tk.DISABLED)
+        
+        # 差异模式开关
+        self.diff_apply_var = tk.BooleanVar(value=config.diff_apply)
+        self.ui_components['diff_apply_check'] = tk.Checkbutton(
+            parent,
+            variable=self.diff_apply_var,
+            command=lambda: setattr(config, "diff_apply", self.diff_apply_var.get()),
+            font=Font.STATUS,
+            bg=Style.BG_DARK,
+            fg=Style.TEXT_GRAY,
+            selectcolor=Style.BG_INPUT,
+            activebackground=Style.BG_DARK,
+            activeforeground=Style.TEXT_WHITE,
+            bd=0,
+            highlightthickness=0
+        )
+        self.translate(self.ui_components['diff_apply_check'], "diff_apply")
+        self.ui_components['diff_apply_check'].pack(anchor=tk.W, pady=(0, 10))
     
+    @span("create_log_panel")
     def create_log_panel(self, parent):
         """创建日志面板"""
         card = tk.Frame(parent, bg=Style.BG_CARD, bd=1, relief=tk.SOLID)
@@ -290,21 +522,67 @@ class ViveToolApp:
         
         self.ui_components['log_title'] = tk.Label(
             title_row,
-            text=config.get("log_title"),
             font=Font.SUBTITLE,
             bg=Style.BG_CARD,
             fg=Style.PRIMARY
         )
+        self.translate(self.ui_components['log_title'], "log_title")
         self.ui_components['log_title'].pack(side=tk.LEFT)
         
         self.ui_components['clear_log_btn'] = self.create_tech_button(
             title_row, 
-            config.get("btn_clear_log"), 
+            "btn_clear_log", 
             self.clear_log, 
             small=True, 
             secondary=True
         )
         
+        self.ui_components['older_log_btn'] = self.create_tech_button(
+            title_row,
+            "btn_older_log",
+            self.load_older_log,
+            small=True,
+            secondary=True
+        )
+        
+        # 搜索与级别筛选
+        search_row = tk.Frame(inner, bg=Style.BG_CARD)
+        search_row.pack(fill=tk.X, pady=(0, 8))
+        
+        self.log_search_var = tk.StringVar()
+        self.ui_components['log_search_entry'] = tk.Entry(
+            search_row,
+            textvariable=self.log_search_var,
+            font=Font.INPUT,
+            bg=Style.BG_INPUT,
+            fg=Style.TEXT_WHITE,
+            insertbackground=Style.TEXT_WHITE,
+            relief=tk.FLAT,
+            bd=0
+        )
+        self.ui_components['log_search_entry'].pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        self.ui_components['log_search_entry'].bind('<KeyRelease>', lambda e: self.schedule_log_filter())
+        
+        self.log_level_var = tk.StringVar(value=config.get("log_level_all"))
+        self.ui_components['log_level_box'] = ttk.Combobox(
+            search_row,
+            textvariable=self.log_level_var,
+            state="readonly",
+            width=8
+        )
+        self.translate(self.ui_components['log_level_box'], values=lambda: [config.get("log_level_all")] + LOG_LEVELS)
+        self.ui_components['log_level_box'].pack(side=tk.LEFT, padx=(0, 5))
+        self.ui_components['log_level_box'].bind('<<ComboboxSelected>>', lambda e: self.apply_log_filter())
+        
+        self.log_match_var = tk.StringVar()
+        tk.Label(
+            search_row,
+            textvariable=self.log_match_var,
+            font=Font.STATUS,
+            bg=Style.BG_CARD,
+            fg=Style.TEXT_GRAY
+        ).pack(side=tk.LEFT)
+        
         # 日志文本框
         self.log_text = scrolledtext.ScrolledText(
             inner,
@@ -322,6 +600,8 @@ class ViveToolApp:
         self.log_text.tag_config("error", foreground=Style.ERROR)
         self.log_text.tag_config("warning", foreground=Style.WARNING)
         self.log_text.tag_config("info", foreground=Style.PRIMARY)
+        self.log_text.tag_config("match", background=Style.PRIMARY_DARK, foreground=Style.TEXT_WHITE)
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
         
         # 结果提示区域
         self.result_frame = tk.Frame(inner, bg=Style.BG_CARD)
@@ -340,21 +620,25 @@ class ViveToolApp:
         
         self.ui_components['restart_btn'] = self.create_tech_button(
             self.result_frame,
-            config.get("btn_restart"),
+            "btn_restart",
             self.restart,
             warning=True
         )
         self.ui_components['restart_btn'].pack(anchor=tk.W, pady=(8, 0))
         self.ui_components['restart_btn'].config(state=tk.DISABLED)
     
+    @span("create_status_bar")
     def create_status_bar(self, parent):
         """创建状态栏"""
         status = tk.Frame(parent, bg=Style.BG_CARD, bd=1, relief=tk.SOLID)
         status.pack(fill=tk.X, pady=(10, 0))
         
+        row = tk.Frame(status, bg=Style.BG_CARD)
+        row.pack(fill=tk.X)
+        
         self.status_var = tk.StringVar(value=config.get("status_ready"))
         self.ui_components['status_label'] = tk.Label(
-            status,
+            row,
             textvariable=self.status_var,
             font=Font.STATUS,
             bg=Style.BG_CARD,
@@ -363,9 +647,128 @@ class ViveToolApp:
             pady=8
         )
         self.ui_components['status_label'].pack(side=tk.LEFT)
+        
+        # 计时面板（只在启用计时时提供）
+        self.span_panel = None
+        self.span_job = None
+        if tracer.enabled:
+            self.ui_components['spans_btn'] = tk.Button(
+                row,
+                font=Font.STATUS,
+                bg=Style.BG_CARD,
+                fg=Style.TEXT_GRAY,
+                relief=tk.FLAT,
+                bd=0,
+                padx=12,
+                command=lambda: self.toggle_span_panel(status),
+                cursor="hand2"
+            )
+            self.translate(self.ui_components['spans_btn'], "btn_spans")
+            self.ui_components['spans_btn'].pack(side=tk.RIGHT)
+    
+    # ============== 计时面板 ==============
+    def toggle_span_panel(self, parent):
+        """在状态栏下方显示/隐藏计时区间汇总"""
+        if self.span_panel is not None:
+            if self.span_job is not None:
+                self.root.after_cancel(self.span_job)
+                self.span_job = None
+            self.span_panel.destroy()
+            self.span_panel = None
+            return
+        
+        self.span_panel = tk.Frame(parent, bg=Style.BG_CARD, padx=12)
+        self.span_panel.pack(fill=tk.X, pady=(0, 8))
+        self.span_text = tk.Text(
+            self.span_panel,
+            height=SPAN_PANEL_ROWS + 2,
+            font=Font.LOG,
+            bg=Style.BG_INPUT,
+            fg=Style.TEXT_WHITE,
+            relief=tk.FLAT,
+            bd=0,
+            wrap=tk.NONE
+        )
+        self.span_text.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 8))
+        self.ui_components['export_trace_btn'] = self.create_tech_button(
+            self.span_panel,
+            "btn_export_trace",
+            self.export_trace,
+            small=True,
+            secondary=True
+        )
+        self.refresh_span_panel()
+    
+    def refresh_span_panel(self):
+        """按总耗时汇总各区间：次数、最近一次、最长、合计（毫秒）"""
+        self.span_job = None
+        if self.span_panel is None:
+            return
+        stats = {}
+        for name, _, _, duration, _ in tracer.snapshot():
+            count, _, longest, total = stats.get(name, (0, 0, 0, 0))
+            stats[name] = (count + 1, duration, max(longest, duration), total + duration)
+        rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:SPAN_PANEL_ROWS]
+        lines = [config.get("span_columns")]
+        for name, (count, last, longest, total) in rows:
+            lines.append(f"{name[:24]:<24} {count:>6} {last / 1e6:>9.2f} {longest / 1e6:>9.2f} {total / 1e6:>10.2f}")
+        lines.append(self.config_writes_text())
+        self.span_text.config(state="normal")
+        self.span_text.delete("1.0", tk.END)
+        self.span_text.insert("1.0", "\n".join(lines))
+        self.span_text.config(state="disabled")
+        self.span_job = self.root.after(SPAN_REFRESH_MS, self.refresh_span_panel)
+    
+    def config_writes_text(self):
+        """配置的修改次数、写盘次数与每次修改的平均写盘次数"""
+        return config.get("info_config_writes").format(
+            writes=config.writes, changes=config.changes, ratio=config.writes_per_action
+        )
+    
+    def export_trace(self):
+        """把缓冲区中的区间导出为 Chrome trace JSON"""
+        path = filedialog.asksaveasfilename(
+            title=config.get("btn_export_trace"),
+            defaultextension=".json",
+            initialfile="vivetool-trace.json",
+            filetypes=[("Chrome trace", "*.json")]
+        )
+        if not path:
+            return
+        try:
+            count = tracer.export(path)
+        except OSError as e:
+            self.log("❌ " + config.get("error_export_trace") + ": " + str(e), "error")
+            return
+        self.log("⏱ " + config.get("info_trace_exported").format(count=count, path=path), "info")
+    
+    # ============== 界面文本 ==============
+    def translate(self, widget, text=None, **options):
+        """登记组件的翻译并立即设置：选项值为翻译键或返回文本的函数，切换语言时由 refresh_ui 统一更新"""
+        if text is not None:
+            options["text"] = text
+        self.translations.setdefault(widget, {}).update(options)
+        widget.configure(**{name: self.resolve_text(value) for name, value in options.items()})
+        return widget
+    
+    @staticmethod
+    def resolve_text(value):
+        return value() if callable(value) else config.get(value)
+    
+    def refresh_translation(self, widget):
+        """按登记表重新设置单个组件的文本（文本函数依赖界面状态时，状态变化后调用）"""
+        widget.configure(**{name: self.resolve_text(value) for name, value in self.translations[widget].items()})
+    
+    def refresh_translations(self):
+        """按登记表逐个组件一次 configure 更新全部文本，已销毁的组件移出登记表"""
+        for widget, options in list(self.translations.items()):
+            try:
+                widget.configure(**{name: self.resolve_text(value) for name, value in options.items()})
+            except tk.TclError:
+                del self.translations[widget]
     
     def create_tech_button(self, parent, text, command, success=False, error=False, warning=False, secondary=False, small=False, expand=False):
-        """创建科技风格按钮"""
+        """创建科技风格按钮；text 为翻译键或返回文本的函数"""
         if success:
             bg = Style.SUCCESS
         elif error:
@@ -379,7 +782,6 @@ class ViveToolApp:
         
         btn = tk.Button(
             parent,
-            text=text,
             font=Font.BODY if not small else Font.STATUS,
             bg=bg,
             fg=Style.TEXT_WHITE,
@@ -390,6 +792,7 @@ class ViveToolApp:
             command=command,
             cursor="hand2"
         )
+        self.translate(btn, text)
         
         if expand:
             btn.pack(side=tk.LEFT, padx=(0, 8), fill=tk.X, expand=True)
@@ -399,31 +802,191 @@ class ViveToolApp:
         return btn
     
     def init_app(self):
-        """初始化"""
-        self.root.after(500, self.auto_search)
+        """初始化：等骨架第一次绘制完成后再构建其余面板"""
+        self.root.bind("<FocusIn>", self.on_focus, add="+")
+        self.root.bind("<Expose>", self.on_expose, add="+")
+        self.root.after(FIRST_PAINT_TIMEOUT_MS, self.on_expose)
+    
+    def on_expose(self, event=None):
+        """首次 Expose：排在本轮重绘之后记录首帧并开始构建面板"""
+        if "expose" not in self.startup_times:
+            self.startup_times["expose"] = time.perf_counter()
+            self.root.after_idle(self.on_first_paint)
+    
+    def on_first_paint(self):
+        self.startup_times["first_paint"] = time.perf_counter()
+        self.build_next_panel()
+    
+    def build_next_panel(self):
+        """每个空闲回调构建一个面板，让窗口在构建过程中保持响应；全部完成后进入可交互状态"""
+        if self.pending_panels:
+            self.pending_panels.popleft()()
+            self.root.after_idle(self.build_next_panel)
+        elif not self.ui_ready:
+            self.on_ui_built()
+    
+    def finish_ui(self):
+        """立即构建尚未构建的面板（切换语言等需要完整界面的操作前调用）"""
+        while self.pending_panels:
+            self.pending_panels.popleft()()
+    
+    def on_ui_built(self):
+        """所有面板已构建：设置路径或开始自动搜索"""
+        self.ui_ready = True
+        # 缓存路径指纹未变化时直接使用，跳过全盘搜索
+        cached = config.vivetool_path
+        if is_fingerprint_valid(cached, config.vivetool_fingerprint):
+            self.set_path(cached, remember=False)
+            self.log("✅ " + config.get("status_found") + ": " + cached, "success")
+        else:
+            self.auto_search()
         self.update_ids_display()
+        self.root.after_idle(self.on_interactive)
+    
+    def on_interactive(self):
+        """界面完整绘制、可以操作：记录启动耗时"""
+        times = self.startup_times
+        times["interactive"] = time.perf_counter()
+        if tracer.enabled:
+            init = int(times["init"] * 1e9)
+            for name in ("first_paint", "interactive"):
+                tracer.record(name, "startup", init, int(times[name] * 1e9) - init)
+        self.log(config.get("info_startup").format(
+            first=round((times["first_paint"] - times["init"]) * 1000),
+            ready=round((times["interactive"] - times["init"]) * 1000)
+        ), "info")
     
     # ============== 搜索功能 ==============
+    @span("auto_search")
     def auto_search(self):
         """自动搜索"""
+        self.start_search(manual=False)
+    
+    def search(self):
+        """手动搜索（搜索进行中时点击则取消）"""
+        if self.search_cancel is not None:
+            self.cancel_search()
+            return
+        self.start_search(manual=True)
+    
+    def start_search(self, manual):
+        """在后台线程中启动搜索，旧的搜索会先被取消"""
+        self.cancel_search(silent=True)
+        self.stop_watch()
+        self.search_token += 1
+        self.search_cancel = threading.Event()
+        self.search_manual = manual
+        self.search_results = []
+        
         self.log("🔍 " + config.get("status_searching"), "info")
-        path = find_vivetool()
-        if path:
+        self.status_var.set(config.get("status_searching"))
+        self.ui_components['search_btn'].config(text=config.get("btn_cancel_search"))
+        
+        threading.Thread(
+            target=self._search_worker,
+            args=(self.search_token, self.search_cancel),
+            daemon=True
+        ).start()
+        self.root.after(SEARCH_POLL_MS, self.poll_search, self.search_token)
+    
+    @span("find_vivetool")
+    def _search_worker(self, token, cancel):
+        """后台搜索线程，结果通过队列交给界面线程"""
+        try:
+            for path in iter_vivetool(cancel=cancel):
+                self.search_queue.put((token, "found", path))
+        except Exception as e:
+            self.search_queue.put((token, "error", str(e)))
+        self.search_queue.put((token, "done", None))
+    
+    def cancel_search(self, silent=False):
+        """取消当前搜索"""
+        if self.search_cancel is None:
+            return
+        self.search_cancel.set()
+        self.search_cancel = None
+        # 更换代号，丢弃旧搜索尚未处理的结果
+        self.search_token += 1
+        self.ui_components['search_btn'].config(text=config.get("btn_search"))
+        if not silent:
+            self.log("⏹ " + config.get("status_search_cancelled"), "warning")
+            self.status_var.set(config.get("status_search_cancelled"))
+    
+    def poll_search(self, token):
+        """在界面线程中处理搜索结果"""
+        if token != self.search_token:
+            return
+        try:
+            while True:
+                item_token, kind, value = self.search_queue.get_nowait()
+                if item_token != self.search_token:
+                    continue
+                if kind == "found":
+                    self.on_search_found(value)
+                elif kind == "error":
+                    self.log("❌ " + value, "error")
+                else:
+                    self.on_search_done()
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(SEARCH_POLL_MS, self.poll_search, token)
+    
+    def on_search_found(self, path):
+        """发现安装目录：首个结果立即启用按钮，之后只在版本更高时切换"""
+        self.search_results.append(path)
+        self.log("✅ " + path, "success")
+        if len(self.search_results) == 1 or parse_version(path) > parse_version(self.vivetool_path or ""):
             self.set_path(path)
+    
+    def on_search_done(self):
+        """搜索结束"""
+        self.search_cancel = None
+        self.ui_components['search_btn'].config(text=config.get("btn_search"))
+        if self.search_results:
             self.log("✅ " + config.get("status_found"), "success")
-        else:
-            self.log("⚠️ " + config.get("status_not_found"), "warning")
-            self.status_var.set(config.get("status_not_found"))
+            return
+        self.log("⚠️ " + config.get("status_not_found"), "warning")
+        self.status_var.set(config.get("status_not_found"))
+        self.start_watch()
+        if self.search_manual:
+            messagebox.showwarning(config.get("error_title"), config.get("error_not_found"))
     
-    def search(self):
-        """手动搜索"""
-        path = find_vivetool()
-        if path:
+    # ============== 目录监视 ==============
+    def start_watch(self):
+        """监视下载、桌面、文档目录，出现 ViVeTool 时自动设置路径"""
+        self.stop_watch()
+        self.watcher = DirectoryWatcher()
+        self.log("👀 " + config.get("status_watching"), "info")
+        self.watch_job = self.root.after(int(self.watcher.interval * 1000), self.poll_watch)
+    
+    def stop_watch(self):
+        """停止监视"""
+        if self.watch_job is not None:
+            self.root.after_cancel(self.watch_job)
+            self.watch_job = None
+        self.watcher = None
+    
+    def poll_watch(self):
+        """轮询一次目录变化"""
+        self.watch_job = None
+        if self.watcher is None:
+            return
+        found = self.watcher.poll()
+        if found:
+            path = rank_installs(found)[0]
+            self.log("✅ " + config.get("info_watch_found") + path, "success")
             self.set_path(path)
-            self.log("✅ " + path, "success")
-        else:
-            self.log("⚠️ " + config.get("status_not_found"), "warning")
-            messagebox.showwarning(config.get("error_title"), config.get("error_not_found"))
+            return
+        self.watch_job = self.root.after(int(self.watcher.interval * 1000), self.poll_watch)
+    
+    def on_focus(self, event=None):
+        """窗口重新获得焦点时立即检查（用户可能刚下载完）"""
+        if self.watcher is None or self.watch_job is None:
+            return
+        self.watcher.reset_interval()
+        self.root.after_cancel(self.watch_job)
+        self.watch_job = self.root.after_idle(self.poll_watch)
     
     def browse(self):
         """浏览文件夹"""
@@ -432,33 +995,101 @@ class ViveToolApp:
             initialdir=str(Path.home() / "Downloads")
         )
         if folder:
+            self.cancel_search(silent=True)
             self.set_path(folder)
             self.log("📂 " + folder, "info")
     
-    def set_path(self, path):
+    def set_path(self, path, remember=True):
         """设置路径"""
+        self.stop_watch()
         self.vivetool_path = path
         self.path_var.set(path)
-        config.vivetool_path = path
+        if remember:
+            config.set_vivetool(path, fingerprint_vivetool(path))
         self.ui_components['enable_btn'].config(state=tk.NORMAL)
         self.ui_components['disable_btn'].config(state=tk.NORMAL)
         self.status_var.set(config.get("status_found"))
     
     # ============== ID管理 ==============
-    def update_ids_display(self):
-        """更新ID显示"""
-        self.ids_text.config(state="normal")
-        self.ids_text.delete(1.0, tk.END)
-        
-        if not self.current_ids:
-            self.ids_text.insert(tk.END, "  " + config.get("status_not_found") + "\n")
+    def update_ids_display(self, reveal=None):
+        """更新ID显示：只生成可见的行，并且只替换内容变化的行
+
+        reveal 为列表中的下标时先滚动到让该行可见。
+        """
+        total = len(self.current_ids)
+        if reveal is not None:
+            if reveal < self.ids_first:
+                self.ids_first = reveal
+            elif reveal >= self.ids_first + IDS_VISIBLE_ROWS:
+                self.ids_first = reveal - IDS_VISIBLE_ROWS + 1
+        self.ids_first = max(0, min(self.ids_first, total - IDS_VISIBLE_ROWS))
+        
+        if total:
+            rows = [self.id_row(fid) for fid in self.current_ids[self.ids_first:self.ids_first + IDS_VISIBLE_ROWS]]
         else:
-            for fid in self.current_ids:
-                self.ids_text.insert(tk.END, "  ● " + fid + "\n")
-        
-        self.ids_text.config(state="disabled")
-        count = len(self.current_ids)
-        self.log("📋 " + config.get("current_list") + ": " + str(count) + " 个ID", "info")
+            rows = [("  " + config.get("status_not_found"), ())]
+        
+        old = self.ids_rows
+        if rows != old:
+            self.ids_text.config(state="normal")
+            # 滚动了不到一屏时，先删掉移出窗口的行、补上移入的行，其余行原样保留
+            shift = self.ids_first - self.ids_rows_first
+            if old and total and 0 < abs(shift) < len(old) == IDS_VISIBLE_ROWS == len(rows):
+                if shift > 0:
+                    self.ids_text.delete("1.0", str(shift + 1) + ".0")
+                    old = old[shift:]
+                else:
+                    shift = -shift
+                    self.ids_text.delete(str(len(old) - shift) + ".end", "end-1c")
+                    for text, tag in reversed(rows[:shift]):
+                        self.ids_text.insert("1.0", text + "\n", tag)
+                    old = rows[:shift] + old[:-shift]
+            for i, (text, tag) in enumerate(rows):
+                if i < len(old):
+                    if old[i] == (text, tag):
+                        continue
+                    line = str(i + 1)
+                    self.ids_text.delete(line + ".0", line + ".end")
+                    self.ids_text.insert(line + ".0", text, tag)
+                else:
+                    self.ids_text.insert("end-1c", ("\n" if i else "") + text, tag)
+            if len(old) > len(rows):
+                self.ids_text.delete(str(len(rows)) + ".end", "end-1c")
+            self.ids_text.config(state="disabled")
+            self.ids_rows = rows
+        self.ids_rows_first = self.ids_first
+        
+        if total > IDS_VISIBLE_ROWS:
+            self.ids_scroll.set(self.ids_first / total, (self.ids_first + IDS_VISIBLE_ROWS) / total)
+        else:
+            self.ids_scroll.set(0.0, 1.0)
+        # 标题的文本函数读取当前 ID 数
+        self.refresh_translation(self.ui_components['features_title'])
+    
+    def id_row(self, fid):
+        """一行ID显示的文本和标签"""
+        text = "  ● " + fid
+        name = self.catalog.name(fid)
+        if name:
+            text += "  " + name
+        state = self.feature_states.get(fid)
+        if state:
+            text += "  [" + config.get("state_" + state) + "]"
+        outcome, code = self.apply_results.get(fid, (None, None))
+        if outcome:
+            text += "  " + config.get("result_" + outcome).format(code=code or "?")
+        return text, ("error",) if outcome == RESULT_ERROR else ()
+    
+    def scroll_ids(self, action, amount, unit=None):
+        """滚动条/鼠标滚轮：移动可见窗口后重新生成可见行"""
+        total = len(self.current_ids)
+        if action == "moveto":
+            self.ids_first = int(float(amount) * total)
+        else:
+            step = IDS_VISIBLE_ROWS if unit == "pages" else 1
+            self.ids_first += int(amount) * step
+        self.update_ids_display()
+        return "break"
     
     def add_id(self):
         """添加ID"""
@@ -474,50 +1105,321 @@ class ViveToolApp:
             messagebox.showwarning(config.get("error_title"), config.get("error_invalid_id"))
             return
         
-        if new_id in self.current_ids:
+        if new_id in self.current_id_set:
             self.log("ℹ️ " + config.get("info_already_exists") + new_id, "info")
             messagebox.showinfo(config.get("info_title"), config.get("info_already_exists") + new_id)
             return
         
         self.current_ids.append(new_id)
+        self.current_id_set.add(new_id)
+        config.profiles.add(config.active_profile, [new_id])
         self.custom_id_var.set("")
-        self.update_ids_display()
+        self.hide_suggestions()
+        self.update_ids_display(reveal=len(self.current_ids) - 1)
         self.log("✅ " + config.get("info_id_added") + new_id, "success")
     
+    def switch_profile(self, name):
+        """切换方案：一次索引读取该方案的 ID"""
+        config.active_profile = name
+        self.profile_var.set(name)
+        self.current_ids = config.feature_ids
+        self.current_id_set = set(self.current_ids)
+        self.apply_results = {}
+        self.ids_first = 0
+        self.update_ids_display()
+        self.log("🗂️ " + config.get("info_profile_switched").format(name=name, count=len(self.current_ids)), "info")
+    
+    def new_profile(self):
+        """以当前列表新建方案并切换过去"""
+        name = simpledialog.askstring(config.get("btn_new_profile"), config.get("profile_name_prompt"), parent=self.root)
+        if not name or not name.strip():
+            return
+        name = name.strip()
+        if not config.profiles.create(name, self.current_ids):
+            messagebox.showwarning(config.get("error_title"), config.get("error_profile_exists").format(name=name))
+            return
+        self.ui_components['profile_box'].config(values=config.profiles.names())
+        self.switch_profile(name)
+    
+    def delete_profile(self):
+        """删除当前方案（至少保留一个）"""
+        names = config.profiles.names()
+        name = config.active_profile
+        if len(names) <= 1:
+            messagebox.showwarning(config.get("error_title"), config.get("error_last_profile"))
+            return
+        if not messagebox.askyesno(config.get("confirm_title"), config.get("confirm_delete_profile").format(name=name)):
+            return
+        config.profiles.delete(name)
+        names.remove(name)
+        self.ui_components['profile_box'].config(values=names)
+        self.switch_profile(names[0])
+    
+    def import_file(self):
+        """从文本、CSV 或 JSON 文件批量导入ID"""
+        path = filedialog.askopenfilename(
+            title=config.get("btn_import"),
+            filetypes=[(config.get("import_filetypes"), "*.txt *.csv *.json"), ("*", "*.*")]
+        )
+        if path:
+            self.log("📂 " + path, "info")
+            self.import_ids(lambda: iter_id_file(path))
+    
+    def import_clipboard(self):
+        """从剪贴板批量导入ID"""
+        try:
+            text = self.root.clipboard_get()
+        except tk.TclError:
+            text = ""
+        if not text.strip():
+            self.log("⚠️ " + config.get("error_clipboard_empty"), "warning")
+            return
+        self.import_ids(lambda: [text])
+    
+    def import_ids(self, source):
+        """后台线程流式解析 source() 产出的文本块并在导入内容内部去重，完成后合并到列表"""
+        def work():
+            start = time.perf_counter()
+            stats = {}
+            ids = list(dict.fromkeys(parse_ids(source(), stats)))
+            return ids, stats.get("parsed", 0), stats.get("invalid", 0), time.perf_counter() - start
+        
+        self.status_var.set(config.get("status_importing"))
+        self.run_task(work, self.on_import_done)
+    
+    def on_import_done(self, result):
+        """导入完成：与当前集合比较去重后追加，只写一行汇总"""
+        self.status_var.set(config.get("status_ready"))
+        if result[0] is False:
+            self.log("❌ " + config.get("error_import") + ": " + result[1], "error")
+            return
+        ids, parsed, invalid, seconds = result
+        new = [fid for fid in ids if fid not in self.current_id_set]
+        self.current_ids.extend(new)
+        self.current_id_set.update(new)
+        # 大批量写入方案放到后台
+        profile = config.active_profile
+        self.run_task(lambda: config.profiles.add(profile, new), lambda result: self.on_profile_saved(profile, result))
+        self.update_ids_display(reveal=len(self.current_ids) - 1 if new else None)
+        self.log("📥 " + config.get("info_import_done").format(
+            parsed=parsed, added=len(new), duplicates=parsed - len(new), invalid=invalid, seconds=seconds
+        ), "success" if new else "info")
+    
+    def on_profile_saved(self, profile, result):
+        """后台写入方案完成；失败时（run_task 返回 (False, 错误)）记录错误"""
+        if isinstance(result, tuple):
+            self.log("❌ " + config.get("error_profile_save").format(name=profile) + ": " + result[1], "error")
+    
+    def suggest_features(self, event=None):
+        """输入时在功能目录中搜索 ID 前缀或名称，显示建议列表"""
+        if event is not None and event.keysym in ("Return", "Down", "Up", "Escape"):
+            return
+        self.catalog_matches = self.catalog.search(self.custom_id_var.get(), SUGGEST_LIMIT)
+        if not self.catalog_matches:
+            self.hide_suggestions()
+            return
+        self.suggest_list.delete(0, tk.END)
+        for fid, name in self.catalog_matches:
+            self.suggest_list.insert(tk.END, fid + "  " + name)
+        if not self.suggest_list.winfo_ismapped():
+            self.suggest_list.pack(fill=tk.X, pady=(4, 0), after=self.suggest_anchor)
+    
+    def hide_suggestions(self):
+        """隐藏建议列表"""
+        self.catalog_matches = []
+        self.suggest_list.pack_forget()
+    
+    def focus_suggestions(self):
+        """从输入框移到建议列表"""
+        if self.catalog_matches:
+            self.suggest_list.focus_set()
+            self.suggest_list.selection_clear(0, tk.END)
+            self.suggest_list.selection_set(0)
+            self.suggest_list.activate(0)
+    
+    def pick_suggestion(self):
+        """选中建议：填入 ID 并添加"""
+        selection = self.suggest_list.curselection()
+        if not selection or selection[0] >= len(self.catalog_matches):
+            return
+        self.custom_id_var.set(self.catalog_matches[selection[0]][0])
+        self.add_id()
+        self.ui_components['custom_id_entry'].focus_set()
+    
     def clear_ids(self):
         """清空ID"""
         if messagebox.askyesno(config.get("confirm_title"), config.get("confirm_clear")):
             self.current_ids = []
+            self.current_id_set = set()
+            config.feature_ids = []
             self.update_ids_display()
             self.log("🗑️ " + config.get("info_ids_cleared"), "warning")
     
     def restore_default(self):
         """恢复默认"""
         self.current_ids = get_default_ids()
+        self.current_id_set = set(self.current_ids)
+        config.feature_ids = self.current_ids
         self.update_ids_display()
         self.log("🔄 " + config.get("info_ids_restored"), "info")
     
     # ============== 日志功能 ==============
     def log(self, message, level="info"):
-        """输出日志"""
+        """输出日志（线程安全，由定时器批量写入日志框）"""
+        self.log_pending.append(self.log_buffer.append(message, level))
+    
+    def flush_log(self):
+        """将排队的日志一次性写入：一次状态切换、一次插入、一次滚动"""
+        chunks = []
+        records = []
+        last_seq = self.log_view[-1][0] if self.log_view else -1
         try:
-            self.log_text.config(state="normal")
-            self.log_text.insert(tk.END, message + "\n")
-            
-            # 尝试应用标签
+            for _ in range(LOG_BATCH_LINES):
+                record = self.log_pending.popleft()
+                # 筛选模式下只进缓冲区；重建视图时已显示的记录不再重复插入
+                if self.log_filtering or record.seq <= last_seq:
+                    continue
+                records.append(record)
+                chunks.append(record.message + "\n")
+                chunks.append(record.level)
+        except IndexError:
+            pass
+        
+        if chunks:
             try:
-                self.log_text.tag_add(level, "end-2c linestart", "end-1c")
-            except:
-                pass
-            
-            self.log_text.see(tk.END)
-            self.log_text.config(state="disabled")
-            self.root.update_idletasks()
-        except Exception as e:
-            print(f"日志输出失败: {e}")
+                self.log_text.config(state="normal")
+                self.log_text.insert(tk.END, *chunks)
+                for record in records:
+                    lines = record.message.count("\n") + 1
+                    self.log_view.append((record.seq, lines))
+                    self.log_view_lines += lines
+                self.trim_log_view()
+                self.log_text.see(tk.END)
+                self.log_text.config(state="disabled")
+            except Exception as e:
+                print(f"日志输出失败: {e}")
+        
+        self.root.after(LOG_FLUSH_MS if self.log_pending or chunks else LOG_IDLE_MS, self.flush_log)
+    
+    def trim_log_view(self):
+        """删除日志框顶部超出显示窗口的行（记录仍在缓冲区或磁盘中）"""
+        removed = 0
+        while self.log_view_lines > self.log_view_limit and self.log_view:
+            _, lines = self.log_view.popleft()
+            self.log_view_lines -= lines
+            removed += lines
+        if removed:
+            self.log_text.delete("1.0", f"{removed + 1}.0")
+    
+    def load_older_log(self):
+        """向前翻页：把更早的日志插入日志框顶部"""
+        if self.log_filtering:
+            return
+        if self.log_view:
+            oldest = self.log_view[0][0]
+        elif self.log_pending:
+            oldest = self.log_pending[0].seq
+        else:
+            oldest = self.log_buffer.next_seq
+        records = self.log_buffer.before(oldest, LOG_PAGE_LINES)
+        if not records:
+            self.log("ℹ️ " + config.get("info_no_older_log"), "info")
+            return
+        
+        chunks = []
+        added = 0
+        for record in records:
+            chunks.append(record.message + "\n")
+            chunks.append(record.level)
+        for record in reversed(records):
+            lines = record.message.count("\n") + 1
+            self.log_view.appendleft((record.seq, lines))
+            added += lines
+        self.log_view_lines += added
+        # 放宽显示窗口，避免刚加载的内容被新日志挤掉
+        self.log_view_limit += added
+        
+        self.log_text.config(state="normal")
+        self.log_text.insert("1.0", *chunks)
+        self.log_text.config(state="disabled")
+        self.log_text.see("1.0")
+    
+    def render_log(self, records):
+        """用给定记录重建日志框内容"""
+        chunks = []
+        self.log_view.clear()
+        self.log_view_lines = 0
+        self.log_view_limit = LOG_VIEW_LINES
+        for record in records:
+            chunks.append(record.message + "\n")
+            chunks.append(record.level)
+            lines = record.message.count("\n") + 1
+            self.log_view.append((record.seq, lines))
+            self.log_view_lines += lines
+        self.log_text.config(state="normal")
+        self.log_text.delete("1.0", tk.END)
+        if chunks:
+            self.log_text.insert(tk.END, *chunks)
+        self.log_text.see(tk.END)
+        self.log_text.config(state="disabled")
+    
+    def schedule_log_filter(self):
+        """输入防抖后再检索"""
+        if self.log_filter_job is not None:
+            self.root.after_cancel(self.log_filter_job)
+        self.log_filter_job = self.root.after(LOG_SEARCH_DELAY_MS, self.apply_log_filter)
+    
+    def apply_log_filter(self):
+        """按关键词和级别筛选日志（使用倒排索引，不扫描日志框）"""
+        self.log_filter_job = None
+        query = self.log_search_var.get().strip()
+        level = self.log_level_var.get()
+        if level not in LOG_LEVELS:
+            level = None
+        
+        if not query and not level:
+            self.log_filtering = False
+            self.log_match_var.set("")
+            self.render_log(self.log_buffer.recent(LOG_VIEW_LINES))
+            return
+        
+        self.log_filtering = True
+        seqs = self.log_buffer.search(query, level, LOG_VIEW_LINES)
+        records = self.log_buffer.get(seqs)
+        self.render_log(records)
+        self.highlight_matches(records, tokenize(query))
+        self.log_match_var.set(config.get("log_matches") + str(len(records)))
+    
+    def highlight_matches(self, records, tokens):
+        """根据记录内容直接计算匹配位置并一次性加标签"""
+        if not tokens:
+            return
+        ranges = []
+        row = 1
+        for record in records:
+            for line in record.message.lower().split("\n"):
+                for token in tokens:
+                    start = line.find(token)
+                    while start >= 0:
+                        col = _tk_len(line[:start])
+                        ranges.append(f"{row}.{col}")
+                        ranges.append(f"{row}.{col + _tk_len(token)}")
+                        start = line.find(token, start + len(token))
+                row += 1
+        if ranges:
+            self.log_text.tag_add("match", *ranges)
     
     def clear_log(self):
         """清空日志"""
+        self.log_filtering = False
+        self.log_search_var.set("")
+        self.log_level_var.set(config.get("log_level_all"))
+        self.log_match_var.set("")
+        self.log_pending.clear()
+        self.log_buffer.clear()
+        self.log_view.clear()
+        self.log_view_lines = 0
+        self.log_view_limit = LOG_VIEW_LINES
         self.log_text.config(state="normal")
         self.log_text.delete(1.0, tk.END)
         self.log_text.config(state="disabled")
@@ -553,6 +1455,7 @@ class ViveToolApp:
         """禁用功能"""
         self.execute("disable")
     
+    @span("execute")
     def execute(self, operation):
         """执行操作"""
         if not self.vivetool_path:
@@ -565,31 +1468,201 @@ class ViveToolApp:
             messagebox.showerror(config.get("error_title"), config.get("error_no_selection"))
             return
         
+        # 差异模式：先补查尚无缓存状态的 ID，再只发送需要变更的 ID
+        ids = format_ids(self.current_ids).split(",")
+        exe = resolve_vivetool_exe(self.vivetool_path)
+        if config.diff_apply and exe:
+            missing = self.feature_states.missing(ids)
+            if missing:
+                self.status_var.set(config.get("status_querying"))
+                self.run_task(lambda: self.run_query(exe, missing), lambda result: self.on_diff_query_done(operation, ids, result))
+                return
+        self.apply(operation, ids)
+    
+    def on_diff_query_done(self, operation, ids, result):
+        """差异模式的补查完成后继续执行（查询失败时状态未知的 ID 照常发送）"""
+        self.on_query_done(result)
+        self.status_var.set(config.get("status_ready"))
+        self.apply(operation, ids)
+    
+    def apply(self, operation, ids):
+        """确认并发送 ID（差异模式下跳过已处于目标状态的 ID）"""
+        self.apply_results = {}
+        if config.diff_apply:
+            target = STATE_ENABLED if operation == "enable" else STATE_DISABLED
+            ids, skipped = self.feature_states.diff(ids, target)
+            self.apply_results.update((fid, (RESULT_ALREADY, None)) for fid in skipped)
+            state_name = config.get("state_" + target)
+            if not ids:
+                message = config.get("info_diff_nothing").format(state=state_name)
+                self.log("ℹ️ " + message, "info")
+                self.result_label.config(text="ℹ️ " + message, fg=Style.PRIMARY)
+                self.ui_components['restart_btn'].config(state=tk.DISABLED)
+                self.status_var.set(config.get("status_ready"))
+                return
+            if skipped:
+                self.log("ℹ️ " + config.get("info_diff_skipped").format(count=len(skipped), state=state_name), "info")
+        
         # 确认
         msg_key = "confirm_" + operation
         if not messagebox.askyesno(
             config.get("confirm_title"),
-            config.get(msg_key) + "\n\n" + "\n".join(self.current_ids)
+            config.get(msg_key) + "\n\n" + preview_ids(ids, "\n")
         ):
             return
         
-        # 构建命令
-        ids_str = format_ids(self.current_ids)
-        cmd = "vivetool /" + operation + " /id:" + ids_str
+        self.send(operation, ids)
+    
+    def send(self, operation, ids, attempts=1):
+        """发送 ID 并执行；attempts 大于 1 时失败的 ID 在退避后重试"""
+        ids_str = ",".join(ids)
         
         # 禁用按钮
         self.ui_components['enable_btn'].config(state=tk.DISABLED)
         self.ui_components['disable_btn'].config(state=tk.DISABLED)
         self.ui_components['restart_btn'].config(state=tk.DISABLED)
+        self.ui_components['retry_btn'].config(state=tk.DISABLED)
         self.result_label.config(text="")
         
         self.log("\n" + "═" * 55, "info")
         self.log("⚡ " + config.get("status_running"), "warning")
-        self.log("📋 " + config.get("current_list") + ": " + ids_str, "info")
+        self.log("📋 " + config.get("current_list") + ": " + preview_ids(ids, ","), "info")
         self.log("═" * 55, "info")
         
-        # 执行命令
-        result, msg = run_command_admin(cmd, self.vivetool_path)
+        with span("execute.build"):
+            prefix = "vivetool /" + operation + " /id:"
+            exe = resolve_vivetool_exe(self.vivetool_path)
+            # 已是管理员时直接运行并捕获输出；启用代理模式时交给常驻的提权代理；否则请求提权运行
+            run = None
+            if exe and is_admin():
+                run = self.run_captured
+            elif exe and config.use_broker:
+                run = self.run_brokered
+            # 按命令行长度上限分批
+            if run is not None:
+                tuner = BatchTuner(config.batch_stats, ids, len(prefix))
+                batches = plan_batches(ids, len(prefix), max_ids=tuner.suggest())
+            else:
+                # 所有批次写入同一个批处理文件，只提权一次（无法捕获输出，不做自动重试）
+                cmd = "\n".join(prefix + ",".join(batch) for batch in plan_batches(ids, len(prefix)))
+        
+        if run is not None:
+            self.run_task(
+                lambda: run(exe, operation, batches, tuner, attempts),
+                lambda result: self.finish_execute(operation, ids_str, *result)
+            )
+        else:
+            with span("execute.launch"):
+                result, msg = run_command_admin(cmd, self.vivetool_path)
+            self.finish_execute(operation, ids_str, result, msg)
+    
+    def retry_failed(self):
+        """只重新发送上次执行失败的 ID（有限次数，间隔指数退避）"""
+        failed = [fid for fid in dict.fromkeys(self.current_ids)
+                  if self.apply_results.get(fid, (None,))[0] == RESULT_ERROR]
+        if not failed or not self.last_operation:
+            self.log("ℹ️ " + config.get("info_no_failed"), "info")
+            self.ui_components['retry_btn'].config(state=tk.DISABLED)
+            return
+        self.log("🔁 " + config.get("info_retry_failed").format(count=len(failed)), "warning")
+        self.send(self.last_operation, failed, RETRY_ATTEMPTS)
+    
+    def log_output(self, line, stream):
+        """逐行写入命令输出（任意线程）"""
+        if line.strip():
+            self.log("  " + line, "error" if stream == "stderr" else "info")
+    
+    def command_result(self, code, output, duration):
+        """把退出代码和输出转换为 finish_execute 的参数"""
+        self.log("⏱ " + config.get("info_exit_code").format(code=code, seconds=duration), "info")
+        if code == 0:
+            return True, "", code, duration
+        lines = output.strip().splitlines()
+        return False, lines[-1] if lines else str(code), code, duration
+    
+    def run_pipeline(self, batches, run_batch, tuner, attempts=1):
+        """后台线程：流水线执行各批次，把每批吞吐记入 tuner，解析每个 ID 的结果并汇总
+
+        attempts 大于 1 时，仍失败的 ID 按原批次分组、间隔指数退避后重新发送。
+        """
+        def on_progress(index, total, batch, result):
+            code, _, seconds = result
+            tuner.record(len(batch), seconds)
+            if total > 1:
+                self.log("📦 " + config.get("info_batch_progress").format(
+                    index=index, total=total, count=len(batch), code=code, seconds=seconds
+                ), "info")
+        
+        def on_retry(attempt, total, count, delay):
+            self.log("🔁 " + config.get("info_retry_attempt").format(
+                attempt=attempt, total=total, count=count, seconds=delay
+            ), "warning")
+        
+        result, results = run_apply(
+            batches, run_batch, config.batch_in_flight, attempts, RETRY_BACKOFF, on_progress, on_retry
+        )
+        config.batch_stats = tuner.stats
+        return self.command_result(*result) + (results,)
+    
+    @span("execute.launch")
+    def run_captured(self, exe, operation, batches, tuner, attempts=1):
+        """后台线程：运行 ViVeTool，输出逐行写入日志"""
+        return self.run_pipeline(batches, lambda batch: run_command_captured(
+            [exe, "/" + operation, "/id:" + ",".join(batch)], self.vivetool_path, self.log_output
+        ), tuner, attempts)
+    
+    @span("execute.launch")
+    def run_brokered(self, exe, operation, batches, tuner, attempts=1):
+        """后台线程：通过提权代理运行 ViVeTool，首次使用时启动代理（仅一次 UAC 提示）"""
+        from broker import BrokerClient
+        if self.broker is not None and self.broker.exe != exe:
+            # 代理只执行启动时指定的 ViVeTool：路径变化后换一个代理
+            self.broker.shutdown()
+            self.broker = None
+        if self.broker is None or not self.broker.connected:
+            self.broker = BrokerClient(exe)
+            if not self.broker.start():
+                self.broker = None
+                return False, config.get("error_broker")
+        return self.run_pipeline(batches, lambda batch: self.broker.submit(
+            [exe, "/" + operation, "/id:" + ",".join(batch)], self.log_output
+        ).result(), tuner, attempts)
+    
+    @span("execute.finish")
+    def finish_execute(self, operation, ids_str, result, msg, code=None, duration=None, results=None):
+        """显示执行结果、记录操作并恢复按钮"""
+        ids = ids_str.split(",")
+        
+        # 每个 ID 的结果；无法捕获输出时只能按整体成败记录
+        if results is None:
+            outcome = (RESULT_APPLIED, None) if result else (RESULT_ERROR, None)
+            results = {fid: outcome for fid in ids}
+        self.apply_results.update(results)
+        self.last_operation = operation
+        failed = [fid for fid in ids if results.get(fid, (None,))[0] == RESULT_ERROR]
+        counts = {RESULT_APPLIED: 0, RESULT_ALREADY: 0, RESULT_ERROR: 0}
+        for outcome, _ in results.values():
+            counts[outcome] += 1
+        summary = config.get("info_apply_summary").format(
+            applied=counts[RESULT_APPLIED], already=counts[RESULT_ALREADY], failed=counts[RESULT_ERROR]
+        )
+        self.log("📊 " + summary, "error" if failed else "info")
+        if result and failed:
+            result, msg = False, summary
+        
+        extra = {}
+        if code is not None:
+            extra = {"exit_code": code, "duration": round(duration, 3)}
+        if failed:
+            extra["failed"] = {fid: results[fid][1] for fid in failed}
+        self.journal.record(operation, self.vivetool_path, ids, result, msg, **extra)
+        
+        # 操作过的 ID 状态失效；能捕获输出时只重新查询这些 ID
+        self.feature_states.invalidate(ids)
+        if code is not None:
+            self.query_states(ids, quiet=True)
+        else:
+            self.update_ids_display()
         
         if result:
             self.log("\n" + "═" * 55, "success")
@@ -606,6 +1679,91 @@ class ViveToolApp:
         if self.vivetool_path:
             self.ui_components['enable_btn'].config(state=tk.NORMAL)
             self.ui_components['disable_btn'].config(state=tk.NORMAL)
+        self.ui_components['retry_btn'].config(state=tk.NORMAL if failed else tk.DISABLED)
+    
+    # ============== 功能状态 ==============
+    def query_states(self, ids=None, quiet=False):
+        """查询功能状态（默认查询当前列表中的 ID）"""
+        exe = resolve_vivetool_exe(self.vivetool_path) if self.vivetool_path else None
+        if not exe:
+            if not quiet:
+                self.log("⚠️ " + config.get("error_not_found"), "error")
+                messagebox.showerror(config.get("error_title"), config.get("error_not_found"))
+            return
+        if ids is None:
+            ids = self.current_ids
+        ids = [fid for fid in ids if validate_id(fid)]
+        if not ids:
+            return
+        self.run_task(lambda: self.run_query(exe, ids), self.on_query_done)
+    
+    def run_query(self, exe, ids=None):
+        """后台线程：分批执行 /query，流式解析后写入状态缓存；ids 为 None 时查询全部
+
+        某批 /query 以非零退出代码结束时抛出 CommandError，该批不写入缓存，由 on_query_done 记录错误。
+        """
+        prefix = "vivetool /query /id:"
+        batches = plan_batches(ids, len(prefix)) if ids else [None]
+        count = 0
+        for batch in batches:
+            args = [exe, "/query"] + (["/id:" + ",".join(batch)] if batch else [])
+            count += self.feature_states.load(parse_query(self.query_lines(args)), batch)
+        return count
+    
+    def query_lines(self, args):
+        """逐行产出查询输出：代理已连接且对应同一个 ViVeTool 时经代理执行，否则直接运行
+
+        输出读完后退出代码非零时抛出 CommandError。
+        """
+        if self.broker is None or not self.broker.connected or self.broker.exe != args[0]:
+            yield from stream_command(args, self.vivetool_path)
+            return
+        lines = queue.Queue()
+        future = self.broker.submit(args, lambda line, stream: lines.put(line))
+        future.add_done_callback(lambda f: lines.put(None))
+        while True:
+            line = lines.get()
+            if line is None:
+                break
+            yield line
+        code, output, _ = future.result()
+        if code != 0:
+            raise CommandError(code, output)
+    
+    def on_query_done(self, result):
+        """查询完成"""
+        if isinstance(result, tuple):
+            self.log("❌ " + config.get("error_query") + ": " + result[1], "error")
+            return
+        self.log("🔎 " + config.get("info_query_done").format(count=result), "info")
+        self.update_ids_display()
+    
+    # ============== 后台任务 ==============
+    def run_task(self, func, callback):
+        """在后台线程执行 func，完成后在界面线程调用 callback(结果)"""
+        def worker():
+            try:
+                result = func()
+            except Exception as e:
+                result = (False, str(e))
+            self.task_queue.put((callback, result))
+        
+        self.tasks_running += 1
+        threading.Thread(target=worker, daemon=True).start()
+        if self.tasks_running == 1:
+            self.root.after(SEARCH_POLL_MS, self.poll_tasks)
+    
+    def poll_tasks(self):
+        """处理已完成的后台任务"""
+        try:
+            while True:
+                callback, result = self.task_queue.get_nowait()
+                self.tasks_running -= 1
+                callback(result)
+        except queue.Empty:
+            pass
+        if self.tasks_running > 0:
+            self.root.after(SEARCH_POLL_MS, self.poll_tasks)
     
     def restart(self):
         """重启计算机"""
@@ -625,41 +1783,22 @@ class ViveToolApp:
     # ============== 语言切换 ==============
     def toggle_language(self):
         """切换语言"""
-        new_lang = config.switch()
-        self.ui_components['lang_btn'].config(text=config.get("btn_lang"))
+        self.finish_ui()
+        config.switch()
         self.refresh_ui()
-        config.save()
-        self.log("🌐 " + ("Switched to English" if new_lang == "en" else "已切换到中文"), "info")
+        self.log("🌐 " + config.get("info_language_switched"), "info")
     
     def refresh_ui(self):
-        """刷新界面所有文本"""
-        # 窗口标题
+        """刷新界面所有文本：登记过翻译的组件一次批量更新，其余为随状态变化的文本"""
         self.root.title(config.get("title"))
-        self.ui_components['title'].config(text="✨ " + config.get("title") + " " + config.get("version"))
-        
-        # 配置区域
-        self.ui_components['config_title'].config(text=config.get("config_title"))
-        self.ui_components['path_label'].config(text=config.get("path_label"))
-        self.ui_components['search_btn'].config(text=config.get("btn_search"))
-        self.ui_components['browse_btn'].config(text=config.get("btn_browse"))
+        self.refresh_translations()
         
-        # 功能区域
-        self.ui_components['features_title'].config(text=config.get("features_title"))
-        self.ui_components['feature_id_label'].config(text=config.get("feature_id_label"))
-        self.ui_components['add_btn'].config(text=config.get("btn_add"))
-        self.ui_components['clear_btn'].config(text=config.get("btn_clear"))
-        self.ui_components['default_btn'].config(text=config.get("btn_default"))
-        
-        # 操作按钮
-        self.ui_components['enable_btn'].config(text=config.get("btn_enable"))
-        self.ui_components['disable_btn'].config(text=config.get("btn_disable"))
-        
-        # 日志区域
-        self.ui_components['log_title'].config(text=config.get("log_title"))
-        self.ui_components['clear_log_btn'].config(text=config.get("btn_clear_log"))
+        # 功能区域（标题带数量、行内状态名）
+        self.update_ids_display()
         
-        # 重启按钮
-        self.ui_components['restart_btn'].config(text=config.get("btn_restart"))
+        # 日志级别筛选
+        if self.log_level_var.get() not in LOG_LEVELS:
+            self.log_level_var.set(config.get("log_level_all"))
         
         # 刷新路径显示
         if self.vivetool_path:
@@ -671,6 +1810,7 @@ class ViveToolApp:
         self.status_var.set(config.get("status_ready"))
 
 
+@span("check_admin")
 def check_admin():
     """检查管理员权限"""
     if not is_admin():
@@ -682,9 +1822,15 @@ def check_admin():
 
 def main():
     """主函数"""
+    # 打包后的程序以 --broker 参数启动时作为提权代理运行
+    if len(sys.argv) > 1 and sys.argv[1] == "--broker":
+        from broker import serve_main
+        serve_main(sys.argv[2:])
+        return
     try:
         check_admin()
-        root = tk.Tk()
+        with span("tk_init"):
+            root = tk.Tk()
         app = ViveToolApp(root)
         root.mainloop()
     except Exception as e:
@@ -5,8 +5,9 @@ a = Analysis(
     ['G:/PyCharm 2025.2/Vivtool3.9/main.py'],
     pathex=[],
     binaries=[],
-    datas=[],
-    hiddenimports=[],
+    datas=[('lang', 'lang')],
+    # 对话框模块由 LazyModule 按名称延迟导入，静态分析看不到
+    hiddenimports=['tkinter.messagebox', 'tkinter.filedialog', 'tkinter.simpledialog'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ViVeTool Manager v3.9 - 配置方案模块
+命名的功能 ID 方案，保存在 SQLite 中（每个 (方案, ID) 一行），按需读取
+"""
+
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+
+DEFAULT_PROFILE = "default"
+# 逐批读取方案 ID 时每批的行数
+PROFILE_FETCH_ROWS = 4096
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS profile_ids (
+    profile INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    fid TEXT NOT NULL,
+    pos INTEGER NOT NULL,
+    PRIMARY KEY (profile, fid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS profile_ids_order ON profile_ids (profile, pos);
+"""
+
+
+class ProfileStore:
+    """方案存储（线程安全，首次使用时才打开数据库）"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn = None
+        self._lock = threading.RLock()
+
+    @property
+    def conn(self) -> "sqlite3.Connection":
+        with self._lock:
+            if self._conn is None:
+                # sqlite3 首次打开数据库时才导入，不拖慢启动
+                import sqlite3
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA foreign_keys=ON")
+                conn.executescript(_SCHEMA)
+                self._conn = conn
+            return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---------- 方案 ----------
+    def names(self) -> List[str]:
+        """所有方案名（按创建顺序）"""
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT name FROM profiles ORDER BY id")]
+
+    def exists(self, name: str) -> bool:
+        return self._profile_id(name) is not None
+
+    def create(self, name: str, ids: Iterable[str] = ()) -> bool:
+        """新建方案，已存在时返回 False"""
+        with self._lock, self.conn:
+            try:
+                cur = self.conn.execute("INSERT INTO profiles (name) VALUES (?)", (name,))
+            except self.conn.IntegrityError:
+                return False
+            self._insert(cur.lastrowid, ids, 0)
+            return True
+
+    def delete(self, name: str) -> bool:
+        """删除方案及其全部 ID"""
+        with self._lock, self.conn:
+            return self.conn.execute("DELETE FROM profiles WHERE name = ?", (name,)).rowcount > 0
+
+    def rename(self, name: str, new_name: str) -> bool:
+        with self._lock, self.conn:
+            try:
+                return self.conn.execute(
+                    "UPDATE profiles SET name = ? WHERE name = ?", (new_name, name)
+                ).rowcount > 0
+            except self.conn.IntegrityError:
+                return False
+
+    def _profile_id(self, name: str, create: bool = False) -> Optional[int]:
+        row = self.conn.execute("SELECT id FROM profiles WHERE name = ?", (name,)).fetchone()
+        if row is None and create:
+            return self.conn.execute("INSERT INTO profiles (name) VALUES (?)", (name,)).lastrowid
+        return row[0] if row else None
+
+    # ---------- 方案中的 ID ----------
+    def ids(self, name: str) -> List[str]:
+        """方案中的全部 ID（按加入顺序，一次索引读取）"""
+        with self._lock:
+            return [row[0] for row in self.conn.execute(
+                "SELECT fid FROM profile_ids WHERE profile = (SELECT id FROM profiles WHERE name = ?) ORDER BY pos",
+                (name,)
+            )]
+
+    def iter_ids(self, name: str, rows: int = PROFILE_FETCH_ROWS) -> Iterator[List[str]]:
+        """逐批读取方案中的 ID，不一次性载入整个方案"""
+        with self._lock:
+            pid = self._profile_id(name)
+        if pid is None:
+            return
+        last = -1
+        while True:
+            with self._lock:
+                batch = self.conn.execute(
+                    "SELECT fid, pos FROM profile_ids WHERE profile = ? AND pos > ? ORDER BY pos LIMIT ?",
+                    (pid, last, rows)
+                ).fetchall()
+            if not batch:
+                return
+            last = batch[-1][1]
+            yield [fid for fid, _ in batch]
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            pid = self._profile_id(name)
+            if pid is None:
+                return 0
+            return self.conn.execute("SELECT COUNT(*) FROM profile_ids WHERE profile = ?", (pid,)).fetchone()[0]
+
+    def contains(self, name: str, fid: str) -> bool:
+        """ID 是否在方案中（主键查找）"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT 1 FROM profile_ids WHERE profile = (SELECT id FROM profiles WHERE name = ?) AND fid = ?",
+                (name, fid)
+            ).fetchone() is not None
+
+    def add(self, name: str, ids: Iterable[str]) -> int:
+        """追加 ID（已有的忽略，方案不存在时自动创建），返回新增数"""
+        with self._lock, self.conn:
+            pid = self._profile_id(name, create=True)
+            last = self.conn.execute("SELECT MAX(pos) FROM profile_ids WHERE profile = ?", (pid,)).fetchone()[0]
+            return self._insert(pid, ids, 0 if last is None else last + 1)
+
+    def remove(self, name: str, ids: Iterable[str]) -> int:
+        """移除 ID，返回移除数"""
+        with self._lock, self.conn:
+            pid = self._profile_id(name)
+            if pid is None:
+                return 0
+            return self.conn.executemany(
+                "DELETE FROM profile_ids WHERE profile = ? AND fid = ?", ((pid, fid) for fid in ids)
+            ).rowcount
+
+    def replace(self, name: str, ids: Iterable[str]) -> int:
+        """用给定的 ID 替换方案内容（方案不存在时自动创建）"""
+        with self._lock, self.conn:
+            pid = self._profile_id(name, create=True)
+            self.conn.execute("DELETE FROM profile_ids WHERE profile = ?", (pid,))
+            return self._insert(pid, ids, 0)
+
+    def _insert(self, pid: int, ids: Iterable[str], start: int) -> int:
+        return self.conn.executemany(
+            "INSERT OR IGNORE INTO profile_ids (profile, fid, pos) VALUES (?, ?, ?)",
+            ((pid, fid, pos) for pos, fid in enumerate(ids, start))
+        ).rowcount
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ViVeTool Manager v3.9 - 耗时统计模块
+轻量的计时区间（span）：可作上下文管理器或装饰器，记录到固定大小的环形缓冲区，可导出为 Chrome trace JSON
+"""
+
+import os
+import time
+import threading
+import functools
+from typing import Callable, List, Optional, Tuple
+
+
+# 环形缓冲区保留的区间数
+SPAN_CAPACITY = 4096
+# 设置此环境变量即启用计时；值以 .json 结尾时退出前写入该文件
+SPAN_ENV = "VIVETOOL_TRACE"
+
+# 一条记录：(名称, 分类, 开始纳秒, 耗时纳秒, 线程 ID)
+SpanRecord = Tuple[str, str, int, int, int]
+
+
+class SpanBuffer:
+    """计时区间的环形缓冲区（线程安全），写满后覆盖最旧的记录"""
+
+    def __init__(self, capacity: int = SPAN_CAPACITY, enabled: bool = False):
+        self.capacity = capacity
+        self.enabled = enabled
+        self.total = 0
+        self._slots: List[Optional[SpanRecord]] = [None] * capacity
+        self._lock = threading.Lock()
+        # 导出时的时间零点
+        self.origin = time.perf_counter_ns()
+
+    def record(self, name: str, cat: str, start: int, duration: int):
+        entry = (name, cat, start, duration, threading.get_ident())
+        with self._lock:
+            self._slots[self.total % self.capacity] = entry
+            self.total += 1
+
+    def snapshot(self) -> List[SpanRecord]:
+        """按记录顺序返回缓冲区中的区间"""
+        with self._lock:
+            if self.total <= self.capacity:
+                return self._slots[:self.total]
+            head = self.total % self.capacity
+            return self._slots[head:] + self._slots[:head]
+
+    def clear(self):
+        with self._lock:
+            self._slots = [None] * self.capacity
+            self.total = 0
+
+    def chrome_trace(self) -> dict:
+        """转换为 Chrome trace 格式（chrome://tracing、Perfetto 可打开），时间单位为微秒"""
+        pid = os.getpid()
+        events = [{
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": (start - self.origin) / 1000,
+            "dur": duration / 1000,
+            "pid": pid,
+            "tid": tid,
+        } for name, cat, start, duration, tid in self.snapshot()]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str) -> int:
+        """写入 Chrome trace JSON 文件，返回区间数"""
+        import json
+        trace = self.chrome_trace()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, ensure_ascii=False)
+        return len(trace["traceEvents"])
+
+
+class Span:
+    """一个计时区间：with span("名称"): ... 或 @span("名称")；未启用时只多一次属性判断"""
+
+    __slots__ = ("name", "cat", "start")
+
+    def __init__(self, name: str, cat: str = "app"):
+        self.name = name
+        self.cat = cat
+        self.start = 0
+
+    def __enter__(self):
+        if tracer.enabled:
+            self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start:
+            tracer.record(self.name, self.cat, self.start, time.perf_counter_ns() - self.start)
+            self.start = 0
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        name, cat = self.name, self.cat
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            # 每次调用使用新的区间对象，递归和多线程调用互不干扰
+            with Span(name, cat):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def span(name: str, cat: str = "app") -> Span:
+    return Span(name, cat)
+
+
+def _export_at_exit(path: str):
+    try:
+        tracer.export(path)
+    except OSError as e:
+        print(f"写入计时文件失败: {e}")
+
+
+# ============== 全局实例 ==============
+_trace_setting = os.environ.get(SPAN_ENV, "")
+tracer = SpanBuffer(enabled=_trace_setting not in ("", "0"))
+if _trace_setting.lower().endswith(".json"):
+    import atexit
+    atexit.register(_export_at_exit, _trace_setting)
@@ -7,8 +7,13 @@ ViVeTool Manager v3.9 - 未来科技风格
 
 import os
 import json
+import atexit
+import threading
 from pathlib import Path
 
+from profiles import ProfileStore, DEFAULT_PROFILE
+from spans import span
+
 
 # ============== 未来科技风格配色 ==============
 class Style:
@@ -59,223 +64,142 @@ class Font:
 
 
 # ============== 多语言翻译 ==============
-LANG = {
-    "zh": {
-        # 窗口
-        "title": "ViVeTool Manager",
-        "version": "v3.9 KAITAO-LGit",
-        
-        # 配置区域
-        "config_title": "⚙️ 系统配置",
-        "path_label": "📂 ViVeTool 路径",
-        "path_searching": "🔍 正在自动搜索...",
-        "path_found": "✅ ViVeTool 已就绪",
-        "path_not_found": "❌ 未找到 ViVeTool",
-        "btn_search": "🔍 智能搜索",
-        "btn_browse": "📂 浏览文件夹",
-        "btn_lang": "English",
-        
-        # 功能区域
-        "features_title": "🎛️ 功能管理",
-        "feature_id_label": "✨ 功能 ID",
-        "feature_placeholder": "输入功能 ID（如：57048231）",
-        "btn_add": "➕ 添加",
-        "btn_clear": "🗑️ 清空",
-        "btn_default": "🔄 恢复默认",
-        "current_list": "📋 当前列表",
-        
-        # 操作按钮
-        "btn_enable": "🚀 启用功能",
-        "btn_disable": "🛑 禁用功能",
-        "btn_clear_log": "✨ 清空日志",
-        
-        # 日志区域
-        "log_title": "📊 执行日志",
-        
-        # 状态
-        "status_ready": "✨ 就绪 - 等待操作",
-        "status_searching": "🔍 正在搜索 ViVeTool...",
-        "status_found": "✅ ViVeTool 路径已确定",
-        "status_not_found": "⚠️ 请选择 ViVeTool 路径",
-        "status_running": "⚡ 正在执行命令...",
-        "status_success": "✅ 操作成功完成",
-        "status_error": "❌ 执行过程中发生错误",
-        
-        # 成功提示
-        "success_title": "🎉 成功",
-        "success_msg": "命令已成功执行！系统更改已生效。",
-        "restart_prompt": "🔄 请立即重启计算机以应用更改",
-        "btn_restart": "🔄 立即重启",
-        
-        # 错误提示
-        "error_title": "⚠️ 错误",
-        "error_not_found": "未找到 ViVeTool 文件夹！请点击「浏览文件夹」手动选择路径。",
-        "error_invalid_id": "无效的功能 ID！ID 必须是纯数字。",
-        "error_no_id": "请输入功能 ID！",
-        "error_no_selection": "请至少选择一个功能！",
-        "error_execution": "命令执行失败",
-        "error_restart": "无法重启计算机，请手动重启",
-        "error_bat_create": "无法创建临时批处理文件",
-        "error_command_send": "命令发送失败",
-        
-        # 确认对话框
-        "confirm_title": "⚡ 确认操作",
-        "confirm_clear": "确定要清空所有功能 ID 吗？",
-        "confirm_enable": "确定要启用以下功能吗？",
-        "confirm_disable": "确定要禁用以下功能吗？",
-        
-        # 信息提示
-        "info_title": "ℹ️ 信息",
-        "info_already_exists": "功能 ID 已在列表中：",
-        "info_id_added": "功能 ID 已添加：",
-        "info_ids_cleared": "已清空所有功能 ID",
-        "info_ids_restored": "已恢复默认功能 ID",
-        
-        # 管理员
-        "admin_title": "🛡️ 需要管理员权限",
-        "admin_msg": "此操作需要管理员权限。是否立即以管理员身份重新运行？",
-        "admin_warning": "⚠️ 权限不足！程序需要管理员权限才能执行此操作。",
-        
-        # 重启对话框
-        "restart_title": "🔄 重启计算机",
-        "restart_msg": "确定要重启计算机吗？请先保存所有未保存的工作！",
-        "restart_success": "重启命令已发送",
-        
-        # 按钮
-        "yes": "是",
-        "no": "否",
-        "ok": "确定",
-        "cancel": "取消",
-        "close": "关闭",
-    },
-    "en": {
-        # Window
-        "title": "ViVeTool Manager",
-        "version": "v3.9 KAITAO-LGit",
-        
-        # Config section
-        "config_title": "⚙️ System Config",
-        "path_label": "📂 ViVeTool Path",
-        "path_searching": "🔍 Auto searching...",
-        "path_found": "✅ ViVeTool Ready",
-        "path_not_found": "❌ ViVeTool Not Found",
-        "btn_search": "🔍 Smart Search",
-        "btn_browse": "📂 Browse Folder",
-        "btn_lang": "中文",
-        
-        # Features section
-        "features_title": "🎛️ Feature Management",
-        "feature_id_label": "✨ Feature ID",
-        "feature_placeholder": "Enter Feature ID (e.g., 57048231)",
-        "btn_add": "➕ Add",
-        "btn_clear": "🗑️ Clear",
-        "btn_default": "🔄 Restore Default",
-        "current_list": "📋 Current List",
-        
-        # Action buttons
-        "btn_enable": "🚀 Enable Features",
-        "btn_disable": "🛑 Disable Features",
-        "btn_clear_log": "✨ Clear Log",
-        
-        # Log section
-        "log_title": "📊 Execution Log",
-        
-        # Status
-        "status_ready": "✨ Ready - Waiting for operation",
-        "status_searching": "🔍 Searching for ViVeTool...",
-        "status_found": "✅ ViVeTool path confirmed",
-        "status_not_found": "⚠️ Please select ViVeTool path",
-        "status_running": "⚡ Executing command...",
-        "status_success": "✅ Operation completed successfully",
-        "status_error": "❌ An error occurred during execution",
-        
-        # Success messages
-        "success_title": "🎉 Success",
-        "success_msg": "Command executed successfully! System changes have been applied.",
-        "restart_prompt": "🔄 Please restart your computer now to apply changes",
-        "btn_restart": "🔄 Restart Now",
-        
-        # Error messages
-        "error_title": "⚠️ Error",
-        "error_not_found": "ViVeTool folder not found! Click 'Browse Folder' to select the path manually.",
-        "error_invalid_id": "Invalid Feature ID! ID must be numeric.",
-        "error_no_id": "Please enter a Feature ID!",
-        "error_no_selection": "Please select at least one feature!",
-        "error_execution": "Command execution failed",
-        "error_restart": "Cannot restart computer, please restart manually",
-        "error_bat_create": "Cannot create temporary batch file",
-        "error_command_send": "Failed to send command",
-        
-        # Confirmation dialogs
-        "confirm_title": "⚡ Confirm Operation",
-        "confirm_clear": "Are you sure you want to clear all Feature IDs?",
-        "confirm_enable": "Are you sure you want to enable these features?",
-        "confirm_disable": "Are you sure you want to disable these features?",
-        
-        # Info messages
-        "info_title": "ℹ️ Info",
-        "info_already_exists": "Feature ID already in list: ",
-        "info_id_added": "Feature ID added: ",
-        "info_ids_cleared": "All Feature IDs have been cleared",
-        "info_ids_restored": "Default Feature IDs have been restored",
-        
-        # Admin
-        "admin_title": "🛡️ Administrator Required",
-        "admin_msg": "This operation requires administrator privileges. Restart as administrator now?",
-        "admin_warning": "⚠️ Insufficient privileges! Administrator rights are required to perform this operation.",
-        
-        # Restart dialog
-        "restart_title": "🔄 Restart Computer",
-        "restart_msg": "Are you sure you want to restart? Please save all unsaved work first!",
-        "restart_success": "Restart command sent",
-        
-        # Buttons
-        "yes": "Yes",
-        "no": "No",
-        "ok": "OK",
-        "cancel": "Cancel",
-        "close": "Close",
-    }
-}
+# 语言包目录：每种语言一个 <代码>.json，index.json 按切换顺序列出语言代码和名称
+LANG_DIR = Path(__file__).parent / "lang"
+DEFAULT_LANGUAGE = "zh"
 
 
 # ============== 配置管理 ==============
+# 配置写入防抖（秒）
+SAVE_DELAY = 0.5
+
+
 class Config:
-    """配置管理器"""
+    """配置管理器
+
+    修改只标记脏键，短暂防抖后合并为一次原子写入（临时文件 + fsync + os.replace），
+    退出时立即写入未保存的修改。
+    """
     
     def __init__(self):
         self.config_file = Path(__file__).parent / "config.json"
-        self.data = {
-            "language": "zh",
+        self.defaults = {
+            "language": DEFAULT_LANGUAGE,
             "vivetool_path": "",
-            "feature_ids": ["57048231", "47205210", "56328729", "48433719"],
+            "vivetool_fingerprint": None,
+            "active_profile": DEFAULT_PROFILE,
+            "use_broker": False,
+            "diff_apply": True,
+            "batch_in_flight": 1,
+            "batch_stats": {},
         }
-        self.load()
+        # 配置数据（首次访问时才读取 config.json）
+        self._data = None
+        self._dirty = set()
+        self._timer = None
+        self._lock = threading.RLock()
+        # 功能 ID 方案存储（首次使用时打开）
+        self._profiles = None
+        # 语言包：已加载的语言包、当前语言的文本表、语言列表（都在首次使用时读取）
+        self._packs = {}
+        self._strings = None
+        self._languages = None
+        # 统计：修改次数与实际写盘次数
+        self.changes = 0
+        self.writes = 0
+        atexit.register(self.flush)
+    
+    @property
+    def data(self):
+        """配置数据，首次访问时加载"""
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    self.load()
+        return self._data
     
+    @span("config.load")
     def load(self):
+        data = dict(self.defaults)
         if self.config_file.exists():
             try:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     saved = json.load(f)
-                    self.data.update(saved)
+                    data.update(saved)
             except Exception as e:
                 print(f"加载配置文件失败: {e}")
+        self._data = data
     
+    def set(self, **values):
+        """修改配置项，值未变化的不会触发写入"""
+        with self._lock:
+            changed = [k for k, v in values.items() if self.data.get(k) != v]
+            if not changed:
+                return
+            for key in changed:
+                self.data[key] = values[key]
+            self._dirty.update(changed)
+            self.changes += 1
+            self.save()
+    
+    @span("config.save")
     def save(self):
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=4)
-        except Exception as e:
-            print(f"保存配置文件失败: {e}")
+        """延迟保存：SAVE_DELAY 秒内的多次修改合并为一次写入"""
+        with self._lock:
+            if not self._dirty:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(SAVE_DELAY, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    @span("config.flush")
+    def flush(self):
+        """立即写入未保存的修改"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            tmp = self.config_file.with_name(self.config_file.name + ".tmp")
+            try:
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(self.data, f, ensure_ascii=False, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.config_file)
+                self._dirty.clear()
+                self.writes += 1
+            except Exception as e:
+                print(f"保存配置文件失败: {e}")
+    
+    @property
+    def writes_per_action(self):
+        """每次修改平均产生的写盘次数"""
+        return self.writes / self.changes if self.changes else 0.0
     
     @property
     def language(self):
-        return self.data.get("language", "zh")
+        return self.data.get("language", DEFAULT_LANGUAGE)
     
     @language.setter
     def language(self, value):
-        self.data["language"] = value
-        self.save()
+        self.set(language=value)
+        self._strings = None
+    
+    @property
+    def languages(self):
+        """可用语言 {代码: 名称}，按切换顺序"""
+        if self._languages is None:
+            try:
+                with open(LANG_DIR / "index.json", 'r', encoding='utf-8') as f:
+                    self._languages = json.load(f)
+            except Exception as e:
+                print(f"加载语言列表失败: {e}")
+                self._languages = {DEFAULT_LANGUAGE: DEFAULT_LANGUAGE}
+        return self._languages
     
     @property
     def vivetool_path(self):
@@ -283,34 +207,124 @@ class Config:
     
     @vivetool_path.setter
     def vivetool_path(self, value):
-        self.data["vivetool_path"] = value
-        self.save()
+        self.set(vivetool_path=value, vivetool_fingerprint=None)
+    
+    @property
+    def vivetool_fingerprint(self):
+        return self.data.get("vivetool_fingerprint")
+    
+    def set_vivetool(self, path, fingerprint):
+        """同时保存 ViVeTool 路径和目录指纹"""
+        self.set(vivetool_path=path, vivetool_fingerprint=fingerprint)
+    
+    @property
+    def profiles(self):
+        """功能 ID 方案存储；首次使用时把旧版 config.json 中的 feature_ids 迁移为默认方案"""
+        with self._lock:
+            if self._profiles is None:
+                self._profiles = ProfileStore(self.config_file.with_name("profiles.db"))
+                legacy = self.data.pop("feature_ids", None)
+                if not self._profiles.names():
+                    self._profiles.create(DEFAULT_PROFILE, legacy if legacy is not None else DEFAULT_IDS)
+                if legacy is not None:
+                    self._dirty.add("feature_ids")
+                    self.save()
+            return self._profiles
+    
+    @property
+    def active_profile(self):
+        """当前方案名"""
+        return self.data.get("active_profile", DEFAULT_PROFILE)
+    
+    @active_profile.setter
+    def active_profile(self, value):
+        self.set(active_profile=value)
     
     @property
     def feature_ids(self):
-        return self.data.get("feature_ids", [])
+        """当前方案中的功能 ID"""
+        return self.profiles.ids(self.active_profile)
     
     @feature_ids.setter
     def feature_ids(self, value):
-        self.data["feature_ids"] = value
-        self.save()
+        self.profiles.replace(self.active_profile, value)
+    
+    @property
+    def use_broker(self):
+        """是否通过常驻提权代理执行命令（默认关闭：Windows 命名管道路径尚未实测）"""
+        return bool(self.data.get("use_broker", False))
+    
+    @use_broker.setter
+    def use_broker(self, value):
+        self.set(use_broker=bool(value))
+    
+    @property
+    def diff_apply(self):
+        """是否只发送状态需要变更的 ID"""
+        return bool(self.data.get("diff_apply", True))
+    
+    @diff_apply.setter
+    def diff_apply(self, value):
+        self.set(diff_apply=bool(value))
+    
+    @property
+    def batch_in_flight(self):
+        """分批执行时同时进行的批数"""
+        return max(1, int(self.data.get("batch_in_flight", 1)))
+    
+    @batch_in_flight.setter
+    def batch_in_flight(self, value):
+        self.set(batch_in_flight=max(1, int(value)))
+    
+    @property
+    def batch_stats(self):
+        """各批大小的吞吐统计"""
+        return self.data.get("batch_stats", {})
+    
+    @batch_stats.setter
+    def batch_stats(self, value):
+        self.set(batch_stats=dict(value))
     
     def get(self, key):
         """获取当前语言文本"""
-        lang = self.language
-        if lang not in LANG:
-            lang = "zh"
-        return LANG[lang].get(key, key)
+        strings = self._strings
+        if strings is None:
+            strings = self._strings = self._load_pack(self.language)
+        text = strings.get(key)
+        if text is None:
+            # 语言包缺少的键取默认语言，仍没有时显示键名
+            text = strings[key] = self._load_pack(DEFAULT_LANGUAGE).get(key, key)
+        return text
+    
+    def _load_pack(self, lang):
+        """读取语言包（每种语言只读取一次），文件不存在或损坏时退回默认语言"""
+        pack = self._packs.get(lang)
+        if pack is None:
+            try:
+                with open(LANG_DIR / f"{lang}.json", 'r', encoding='utf-8') as f:
+                    pack = json.load(f)
+            except Exception as e:
+                print(f"加载语言包失败: {e}")
+                pack = {} if lang == DEFAULT_LANGUAGE else self._load_pack(DEFAULT_LANGUAGE)
+            self._packs[lang] = pack
+        return pack
+    
+    def next_language(self):
+        """切换按钮的目标语言：语言列表中的下一种"""
+        codes = list(self.languages)
+        if self.language not in codes:
+            return codes[0]
+        return codes[(codes.index(self.language) + 1) % len(codes)]
     
     def switch(self):
         """切换语言"""
-        new_lang = "en" if self.language == "zh" else "zh"
+        new_lang = self.next_language()
         self.language = new_lang
         return new_lang
 
 
-config = Config()
-
-
 # ============== 默认值 ==============
 DEFAULT_IDS = ["57048231", "47205210", "56328729", "48433719"]
+
+
+config = Config()
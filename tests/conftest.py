@@ -0,0 +1,23 @@
+"""测试直接导入仓库根目录下的模块；提供用 Python 脚本模拟的 vivetool"""
+
+import os
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def fake_vivetool(tmp_path):
+    """make(脚本正文) 在临时目录中生成可执行的 vivetool 脚本，返回 (目录, 可执行文件路径)"""
+
+    def make(body: str):
+        exe = tmp_path / "vivetool"
+        exe.write_text(f"#!{sys.executable}\nimport sys, time\n" + textwrap.dedent(body), encoding="utf-8")
+        os.chmod(exe, 0o755)
+        return str(tmp_path), str(exe)
+
+    return make
@@ -0,0 +1,65 @@
+"""/enable、/disable 逐 ID 结果解析与失败重试的测试"""
+
+from featurestate import RESULT_ALREADY, RESULT_APPLIED, RESULT_ERROR, parse_apply
+from utils import run_apply
+
+
+def test_all_succeed():
+    output = ["ViVeTool v0.3.4", "Successfully set feature configuration(s)"]
+    assert parse_apply(output, ["1", "2"], 0) == {"1": (RESULT_APPLIED, None), "2": (RESULT_APPLIED, None)}
+
+
+def test_generic_error():
+    output = ["An error occurred while setting a feature configuration. Error code: 0x80070005"]
+    assert parse_apply(output, ["1", "2"], 5) == {"1": (RESULT_ERROR, "0x80070005"), "2": (RESULT_ERROR, "0x80070005")}
+
+
+def test_generic_error_without_code_uses_exit_code():
+    assert parse_apply(["Access is denied"], ["1"], 5) == {"1": (RESULT_ERROR, "5")}
+
+
+def test_per_id_errors():
+    output = [
+        "Feature 1 is already enabled",
+        "Failed to set feature 2, error code: 0xc0000022",
+        "Successfully set feature configuration(s)",
+    ]
+    assert parse_apply(output, ["1", "2", "3"], 1) == {
+        "1": (RESULT_ALREADY, None),
+        "2": (RESULT_ERROR, "0xc0000022"),
+        "3": (RESULT_APPLIED, None),
+    }
+
+
+def test_retry_resends_only_failed_ids():
+    calls = []
+
+    def run_batch(batch):
+        calls.append(list(batch))
+        # 第一次 2 失败，之后成功
+        if len(calls) == 1:
+            return 1, "Successfully set feature configuration(s)\nFailed to set feature 2, error code: 0x1", 0.01
+        return 0, "Successfully set feature configuration(s)", 0.01
+
+    retries = []
+    (code, _, _), results = run_apply(
+        [["1", "2", "3"]], run_batch, attempts=3, backoff=0,
+        on_retry=lambda attempt, total, count, delay: retries.append((attempt, count, delay)),
+    )
+    assert calls == [["1", "2", "3"], ["2"]]
+    assert retries == [(2, 1, 0)]
+    assert code == 0
+    assert all(outcome == RESULT_APPLIED for outcome, _ in results.values())
+
+
+def test_retry_gives_up_after_attempts():
+    calls = []
+
+    def run_batch(batch):
+        calls.append(list(batch))
+        return 5, "Access is denied", 0.01
+
+    (code, _, _), results = run_apply([["1"], ["2"]], run_batch, attempts=2, backoff=0)
+    assert len(calls) == 4
+    assert code == 5
+    assert results == {"1": (RESULT_ERROR, "5"), "2": (RESULT_ERROR, "5")}
@@ -0,0 +1,37 @@
+"""提权代理（不提权启动，Unix 套接字）的测试"""
+
+import sys
+import time
+
+import pytest
+
+from broker import BrokerClient, check_request
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="AF_PIPE 需要提权启动")
+
+
+def test_check_request(tmp_path):
+    exe = str(tmp_path / "vivetool")
+    assert check_request([exe, "/enable", "/id:1,2"], exe) is None
+    assert check_request([exe, "/query"], exe) is None
+    assert check_request(["/bin/sh", "-c", "id"], exe) is not None
+    assert check_request([exe, "/fullreset"], exe) is not None
+    assert check_request([exe, "/enable", "/id:1;rm"], exe) is not None
+    assert check_request([exe, "/enable"], exe) is not None
+
+
+def test_broker_runs_only_vivetool(fake_vivetool):
+    folder, exe = fake_vivetool("print(' '.join(sys.argv[1:]))")
+    client = BrokerClient(exe, idle_timeout=5)
+    assert client.start(elevate=False)
+    try:
+        assert client.submit([exe, "/enable", "/id:1,2"]).result(10)[:2] == (0, "/enable /id:1,2")
+        assert client.submit([sys.executable, "-c", "pass"]).result(10)[0] == -1
+        # 不是 JSON 的消息（如 pickle）使代理断开并退出
+        client.conn.send({"type": "run"})
+        deadline = time.monotonic() + 5
+        while client.connected and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not client.connected
+    finally:
+        client.shutdown()
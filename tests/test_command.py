@@ -0,0 +1,46 @@
+"""以子进程执行 vivetool 并捕获输出的测试（用 Python 脚本模拟 vivetool）"""
+
+import time
+
+from utils import run_command_captured
+
+
+def test_streams_lines_with_real_exit_code(fake_vivetool):
+    folder, exe = fake_vivetool("""
+    print("ViVeTool v0.3.4", flush=True)
+    print("Failed to set feature 1", file=sys.stderr, flush=True)
+    time.sleep(0.2)
+    print("done", flush=True)
+    sys.exit(3)
+    """)
+    lines = []
+    code, output, duration = run_command_captured(
+        [exe, "/enable", "/id:1"], folder, lambda line, stream: lines.append((line, stream))
+    )
+    assert code == 3
+    assert sorted(lines) == [("Failed to set feature 1", "stderr"), ("ViVeTool v0.3.4", "stdout"), ("done", "stdout")]
+    assert set(output.splitlines()) == {"ViVeTool v0.3.4", "Failed to set feature 1", "done"}
+    assert 0.2 <= duration < 5
+
+
+def test_lines_arrive_before_exit(fake_vivetool):
+    folder, exe = fake_vivetool("""
+    print("first", flush=True)
+    time.sleep(0.3)
+    """)
+    seen = []
+    start = time.perf_counter()
+    code, _, duration = run_command_captured(
+        [exe], folder, lambda line, stream: seen.append(time.perf_counter() - start)
+    )
+    assert code == 0
+    # 第一行在进程结束前就已回调
+    assert seen and seen[0] < duration - 0.1
+
+
+def test_timeout_and_missing_exe(fake_vivetool, tmp_path):
+    folder, exe = fake_vivetool("time.sleep(10)")
+    code, output, duration = run_command_captured([exe], folder, timeout=0.3)
+    assert code == -1 and duration < 5
+    code, output, _ = run_command_captured([str(tmp_path / "missing.exe")])
+    assert code == -1
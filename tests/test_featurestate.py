@@ -0,0 +1,49 @@
+"""featurestate 解析 /query 输出的测试（样例为 ViVeTool /query 的输出格式）"""
+
+from pathlib import Path
+
+from featurestate import (
+    STATE_DEFAULT, STATE_DISABLED, STATE_ENABLED, FeatureStates, parse_query,
+)
+
+
+SAMPLE = Path(__file__).parent / "fixtures" / "query_sample.txt"
+
+
+def sample_lines():
+    with open(SAMPLE, "r", encoding="utf-8") as f:
+        yield from f
+
+
+def test_parse_query_blocks():
+    records = list(parse_query(sample_lines()))
+    assert [fid for fid, _ in records] == [
+        "40604019", "40604019", "41415841", "41415841", "12345678", "39145991", "44152747",
+    ]
+    assert records[1][1] == {"priority": "User (8)", "state": "Enabled (2)", "type": "Override (0)"}
+    # “No configuration for feature ID” 产出空字段
+    assert records[4][1] == {}
+
+
+def test_parse_query_block_cut_off_at_eof():
+    fid, fields = list(parse_query(sample_lines()))[-1]
+    assert fid == "44152747"
+    assert fields == {"priority": "User (8)", "state": "Enabled (2)"}
+
+
+def test_load_highest_priority_wins():
+    states = FeatureStates()
+    states.load(parse_query(sample_lines()))
+    assert states.get("40604019") == STATE_ENABLED
+    assert states.get("41415841") == STATE_DISABLED
+    assert states.get("39145991") == STATE_DEFAULT
+    assert states.get("12345678") == STATE_DEFAULT
+    assert states.get("44152747") == STATE_ENABLED
+
+
+def test_load_queried_ids_without_block_are_default():
+    states = FeatureStates()
+    count = states.load(parse_query(sample_lines()), ["40604019", "99999999"])
+    assert count == 6
+    assert states.get("99999999") == STATE_DEFAULT
+    assert states.get("40604019") == STATE_ENABLED
@@ -0,0 +1,42 @@
+"""utils.parse_ids 的测试"""
+
+from utils import iter_id_file, parse_ids
+
+
+def test_plain_ids_and_ranges():
+    assert list(parse_ids(["1, 2;3\n4-6"])) == ["1", "2", "3", "4", "5", "6"]
+
+
+def test_leading_zeros_and_32_bit_limit():
+    stats = {}
+    assert list(parse_ids(["12,0034 0 4294967296 4294967295"], stats)) == ["12", "34", "4294967295"]
+    assert stats == {"parsed": 3, "invalid": 2}
+
+
+def test_non_ascii_digits():
+    # 上标数字不是 ID，其他书写系统的十进制数字规范化为 ASCII
+    assert list(parse_ids(["1²"])) == []
+    assert list(parse_ids(["١٢٣"])) == ["123"]
+
+
+def test_other_whitespace_separates_tokens():
+    assert list(parse_ids(["1\x0b0"])) == ["1"]
+    assert list(parse_ids(["5\x0b007"])) == ["5", "7"]
+
+
+def json_ids(tmp_path, text):
+    path = tmp_path / "ids.json"
+    path.write_text(text, encoding="utf-8")
+    return list(parse_ids(iter_id_file(str(path))))
+
+
+def test_json_top_level_and_keyed_arrays(tmp_path):
+    assert json_ids(tmp_path, '[1, "2", [3]]') == ["1", "2", "3"]
+    assert json_ids(tmp_path, '{"ids": [4, 5], "id": 6}') == ["4", "5", "6"]
+
+
+def test_json_nested_objects_do_not_inherit_id_keys(tmp_path):
+    # 只取 id，不取名称里的数字
+    assert json_ids(tmp_path, '{"features": [{"id": 5, "name": "x 77"}]}') == ["5"]
+    # 其他键下的数组不是 ID，但其中的对象仍按键查找
+    assert json_ids(tmp_path, '{"other": [1, 2], "meta": {"count": 3}, "groups": [{"ids": [8]}]}') == ["8"]
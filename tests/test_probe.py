@@ -0,0 +1,47 @@
+"""根目录并发探测的测试（注入慢速和挂起的探测）"""
+
+import threading
+import time
+from pathlib import Path
+
+from utils import clear_probe_cache, probe_roots
+
+
+def test_hanging_probe_times_out_and_is_negatively_cached():
+    clear_probe_cache()
+    hang = threading.Event()
+    calls = []
+    fast, slow, stuck = Path("/fast"), Path("/slow"), Path("/stuck")
+
+    def probe(root):
+        calls.append(root)
+        if root == slow:
+            time.sleep(0.05)
+        elif root == stuck:
+            hang.wait()
+        return True
+
+    try:
+        start = time.monotonic()
+        assert probe_roots([stuck, fast, slow], probe=probe, timeout=0.3) == [fast, slow]
+        assert time.monotonic() - start < 1.0
+
+        # 负缓存有效期内不再探测挂起的根目录
+        calls.clear()
+        assert probe_roots([stuck, fast], probe=probe, timeout=0.3) == [fast]
+        assert calls == [fast]
+    finally:
+        hang.set()
+        clear_probe_cache()
+
+
+def test_missing_root_is_cached_until_cleared():
+    clear_probe_cache()
+    missing = Path("/missing")
+    assert probe_roots([missing], probe=lambda root: False) == []
+    calls = []
+    assert probe_roots([missing], probe=lambda root: calls.append(root) or True) == []
+    assert calls == []
+    clear_probe_cache()
+    assert probe_roots([missing], probe=lambda root: calls.append(root) or True) == [missing]
+    assert calls == [missing]
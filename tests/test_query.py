@@ -0,0 +1,47 @@
+"""/query 以非零退出代码结束时的处理"""
+
+import json
+
+import pytest
+
+import cli
+from featurestate import FeatureStates, parse_query
+from utils import CommandError, stream_command
+
+
+ACCESS_DENIED = """
+print("Access is denied")
+sys.exit(5)
+"""
+
+
+def test_stream_command_raises_on_nonzero_exit(fake_vivetool):
+    folder, exe = fake_vivetool(ACCESS_DENIED)
+    states = FeatureStates()
+    with pytest.raises(CommandError) as e:
+        states.load(parse_query(stream_command([exe, "/query", "/id:1,2"], folder)), ["1", "2"])
+    assert e.value.code == 5
+    assert "Access is denied" in str(e.value)
+    # 失败的输出不写入缓存（否则未出现的 ID 会被当成默认状态）
+    assert states.snapshot() == {}
+
+
+def test_cli_query_fails(fake_vivetool, capsys):
+    folder, _ = fake_vivetool(ACCESS_DENIED)
+    code = cli.main(["--path", folder, "query", "1", "2"])
+    result = json.loads(capsys.readouterr().out)
+    assert code == cli.EXIT_FAILED
+    assert result["ok"] is False
+    assert "exit code 5" in result["error"]
+
+
+def test_cli_query_ok(fake_vivetool, capsys):
+    folder, _ = fake_vivetool("""
+    print("[1]")
+    print("Priority        : User (8)")
+    print("State           : Enabled (2)")
+    """)
+    code = cli.main(["--path", folder, "query", "1", "2"])
+    result = json.loads(capsys.readouterr().out)
+    assert code == cli.EXIT_OK
+    assert result["states"] == {"1": "enabled", "2": "default"}
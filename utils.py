@@ -5,18 +5,36 @@ ViVeTool Manager v3.9 - 工具函数模块
 """
 
 import os
+import re
 import sys
-import subprocess
 import threading
-import ctypes
 import time
+import queue
+from collections import deque
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from featurestate import parse_apply, RESULT_ERROR
+
+
+class LazyModule:
+    """模块代理：首次访问属性时才导入真正的模块，用于启动时用不到的模块"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            __import__(self._name)
+            self._module = sys.modules[self._name]
+        return getattr(self._module, attr)
 
 
 def is_admin() -> bool:
     """检查管理员权限"""
     try:
+        import ctypes
         return ctypes.windll.shell32.IsUserAnAdmin()
     except Exception as e:
         print(f"检查管理员权限失败: {e}")
@@ -28,6 +46,7 @@ def run_as_admin(script_path: Optional[str] = None) -> bool:
     if script_path is None:
         script_path = os.path.abspath(sys.argv[0])
     try:
+        import ctypes
         ret = ctypes.windll.shell32.ShellExecuteW(
             None, "runas", sys.executable, f'"{script_path}"', None, 1
         )
@@ -37,52 +56,644 @@ def run_as_admin(script_path: Optional[str] = None) -> bool:
         return False
 
 
-def find_vivetool() -> Optional[str]:
-    """搜索ViVeTool文件夹"""
-    search_paths = [
-        Path.home() / "Downloads",
-        Path.home() / "Desktop",
-        Path.home() / "Documents",
-        Path("C:/Downloads"),
-        Path("D:/Downloads"),
-        Path("C:/"),
-        Path("D:/"),
-        Path("E:/"),
-        Path("F:/"),
-        Path("G:/"),
-        Path("H:/"),
-        Path("I:/"),
-        Path("J:/"),
-        Path("K:/"),
-        Path("L:/"),
-        Path("M:/"),
-        Path("N:/"),
-        Path("O:/"),
-        Path("P:/"),
-        Path("Q:/"),
-        Path("R:/"),
-        Path("S:/"),
-        Path("T:/"),
-        Path("U:/"),
-        Path("V:/"),
-    ]
-    names = [
-        "ViVeTool-v0.3.4-IntelAmd",
-        "ViVeTool-v0.3.4",
-        "ViVeTool-v0.3.3",
-        "ViVeTool-v0.3.2",
-        "ViVeTool",
-    ]
-    for base in search_paths:
-        if not base.exists():
+# ============== 搜索功能 ==============
+# 单个根目录的探测时限（秒），断开的映射盘可能阻塞数秒
+PROBE_TIMEOUT = 1.5
+# 同时进行的探测数量上限
+PROBE_WORKERS = 8
+# 不可用根目录的负缓存有效期（秒）
+NEGATIVE_CACHE_TTL = 60.0
+
+# 目录扫描深度（根目录本身为第 0 层）
+SEARCH_DEPTH = 3
+
+VIVETOOL_EXE = "vivetool.exe"
+
+# 不进入的目录（小写比较）：系统目录、体积大且不可能存放 ViVeTool 的目录
+PRUNE_DIRS = frozenset({
+    "windows",
+    "program files",
+    "program files (x86)",
+    "programdata",
+    "appdata",
+    "recovery",
+    "perflogs",
+    "system volume information",
+    "node_modules",
+    "site-packages",
+    "__pycache__",
+    "venv",
+    ".venv",
+    ".git",
+    ".svn",
+    ".hg",
+})
+
+_VERSION_RE = re.compile(r"v?(\d+(?:\.\d+)+)", re.IGNORECASE)
+
+_negative_cache: Dict[str, float] = {}
+_negative_lock = threading.Lock()
+
+
+def list_drives() -> List[Path]:
+    """列出系统中实际存在的盘符"""
+    try:
+        import ctypes
+        mask = ctypes.windll.kernel32.GetLogicalDrives()
+    except Exception:
+        return []
+    drives = []
+    for i in range(26):
+        letter = chr(ord("A") + i)
+        # 跳过软驱盘符
+        if letter in "AB":
+            continue
+        if mask & (1 << i):
+            drives.append(Path(f"{letter}:/"))
+    return drives
+
+
+def clear_probe_cache():
+    """清空根目录负缓存"""
+    with _negative_lock:
+        _negative_cache.clear()
+
+
+def _is_negative(root: Path, now: float) -> bool:
+    with _negative_lock:
+        expires = _negative_cache.get(str(root))
+        if expires is None:
+            return False
+        if expires <= now:
+            del _negative_cache[str(root)]
+            return False
+        return True
+
+
+def _mark_negative(root: Path, now: float):
+    with _negative_lock:
+        _negative_cache[str(root)] = now + NEGATIVE_CACHE_TTL
+
+
+def probe_roots(
+    roots: List[Path],
+    probe: Optional[Callable[[Path], bool]] = None,
+    timeout: float = PROBE_TIMEOUT,
+    max_workers: int = PROBE_WORKERS,
+) -> List[Path]:
+    """并发探测根目录，返回可访问的根目录（保持原有顺序）
+
+    每个根目录有独立的时限，超时的探测线程直接放弃（守护线程，不阻塞退出），
+    不存在或超时的根目录写入负缓存，在有效期内不再探测。
+    """
+    if probe is None:
+        probe = os.path.isdir
+
+    now = time.monotonic()
+    pending = deque((i, r) for i, r in enumerate(roots) if not _is_negative(r, now))
+    done = queue.Queue()
+    running = {}
+    alive = {}
+
+    def worker(index, root):
+        try:
+            ok = bool(probe(root))
+        except Exception:
+            ok = False
+        done.put((index, ok))
+
+    while pending or running:
+        while pending and len(running) < max_workers:
+            index, root = pending.popleft()
+            running[index] = time.monotonic() + timeout
+            threading.Thread(target=worker, args=(index, root), daemon=True).start()
+
+        wait = max(0.0, min(running.values()) - time.monotonic())
+        try:
+            index, ok = done.get(timeout=wait)
+        except queue.Empty:
+            index = None
+        if index is not None and index in running:
+            del running[index]
+            if ok:
+                alive[index] = roots[index]
+            else:
+                _mark_negative(roots[index], time.monotonic())
+
+        # 放弃已超时的探测
+        now = time.monotonic()
+        for index in [i for i, deadline in running.items() if deadline <= now]:
+            del running[index]
+            _mark_negative(roots[index], now)
+
+    return [alive[i] for i in sorted(alive)]
+
+
+def parse_version(path: str) -> Tuple[int, ...]:
+    """从路径中解析 ViVeTool 版本号，取最靠近末端的版本，无版本返回空元组"""
+    for part in reversed(Path(path).parts):
+        match = _VERSION_RE.search(part)
+        if match:
+            return tuple(int(n) for n in match.group(1).split("."))
+    return ()
+
+
+def scan_vivetool(
+    root: Path,
+    depth: int = SEARCH_DEPTH,
+    cancel: Optional[threading.Event] = None,
+) -> Iterator[str]:
+    """在单个根目录下按有限深度扫描包含 ViVeTool.exe 的文件夹"""
+    pending = deque([(str(root), 0)])
+    while pending:
+        if cancel is not None and cancel.is_set():
+            return
+        folder, level = pending.popleft()
+        subdirs = []
+        is_install = False
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    name = entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if level < depth and name[0] not in ".$" and name.lower() not in PRUNE_DIRS:
+                                subdirs.append(entry.path)
+                        elif name.lower() == VIVETOOL_EXE:
+                            is_install = True
+                    except OSError:
+                        continue
+        except OSError:
             continue
-        for name in names:
-            path = base / name
-            if path.is_dir():
-                return str(path)
+        if is_install:
+            # 已确认的安装目录不再向下搜索
+            yield folder
+            continue
+        pending.extend((sub, level + 1) for sub in subdirs)
+
+
+def get_home_roots() -> List[Path]:
+    """用户目录下的常用下载位置"""
+    home = Path.home()
+    return [home / "Downloads", home / "Desktop", home / "Documents"]
+
+
+def iter_vivetool(
+    roots: Optional[List[Path]] = None,
+    probe: Optional[Callable[[Path], bool]] = None,
+    timeout: float = PROBE_TIMEOUT,
+    depth: int = SEARCH_DEPTH,
+    cancel: Optional[threading.Event] = None,
+) -> Iterator[str]:
+    """按发现顺序逐个产出 ViVeTool 安装目录（已去重，未排序）"""
+    if roots is None:
+        roots = get_home_roots() + list_drives()
+    available = probe_roots(roots, probe=probe, timeout=timeout)
+
+    seen = set()
+    for base in available:
+        for path in scan_vivetool(base, depth, cancel):
+            key = os.path.normcase(os.path.abspath(path))
+            if key in seen:
+                continue
+            seen.add(key)
+            yield path
+
+
+def rank_installs(installs: List[str]) -> List[str]:
+    """按版本从高到低排序；同版本保持发现顺序（常用目录在前、浅层在前）"""
+    order = {path: i for i, path in enumerate(installs)}
+    return sorted(installs, key=lambda p: (parse_version(p), -order[p]), reverse=True)
+
+
+def discover_vivetool(
+    roots: Optional[List[Path]] = None,
+    probe: Optional[Callable[[Path], bool]] = None,
+    timeout: float = PROBE_TIMEOUT,
+    depth: int = SEARCH_DEPTH,
+) -> List[str]:
+    """搜索所有 ViVeTool 安装目录，按版本从高到低排序"""
+    return rank_installs(list(iter_vivetool(roots, probe=probe, timeout=timeout, depth=depth)))
+
+
+def find_vivetool(
+    roots: Optional[List[Path]] = None,
+    probe: Optional[Callable[[Path], bool]] = None,
+    timeout: float = PROBE_TIMEOUT,
+    depth: int = SEARCH_DEPTH,
+) -> Optional[str]:
+    """搜索ViVeTool文件夹，返回版本最高的一个"""
+    installs = discover_vivetool(roots, probe=probe, timeout=timeout, depth=depth)
+    return installs[0] if installs else None
+
+
+# ============== 目录监视 ==============
+# 轮询间隔（秒）：有变化时回到最小值，空闲时逐步退避到最大值
+WATCH_MIN_INTERVAL = 1.0
+WATCH_MAX_INTERVAL = 30.0
+WATCH_BACKOFF = 1.5
+
+
+class DirectoryWatcher:
+    """增量目录监视器
+
+    记录被监视目录的 mtime 和条目名，每次轮询只 stat 这些目录，
+    mtime 变化时才 scandir 求差集，只扫描新增的子目录，
+    开销与变化量成正比而与目录树大小无关。
+    """
+
+    def __init__(self, roots: Optional[List[Path]] = None, depth: int = SEARCH_DEPTH):
+        self.depth = depth
+        self.interval = WATCH_MIN_INTERVAL
+        self._dirs: Dict[str, Tuple[int, Optional[int], frozenset]] = {}
+        self._reported = set()
+        for root in (roots if roots is not None else get_home_roots()):
+            self._track(str(root), 0)
+
+    @staticmethod
+    def _snapshot(path: str) -> Tuple[Optional[int], frozenset]:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                names = frozenset(entry.name for entry in it)
+        except OSError:
+            return None, frozenset()
+        return mtime, names
+
+    def _track(self, path: str, level: int):
+        mtime, names = self._snapshot(path)
+        self._dirs[path] = (level, mtime, names)
+
+    def _track_tree(self, path: str, level: int):
+        """监视目录及其中已有的子目录（直到 depth 层）"""
+        if level >= self.depth or path in self._dirs:
+            return
+        self._track(path, level)
+        for name in self._dirs[path][2]:
+            if name[0] in ".$" or name.lower() in PRUNE_DIRS:
+                continue
+            sub = os.path.join(path, name)
+            if os.path.isdir(sub) and not os.path.islink(sub):
+                self._track_tree(sub, level + 1)
+
+    def _report(self, path: str, found: List[str]):
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in self._reported:
+            self._reported.add(key)
+            found.append(path)
+
+    def reset_interval(self):
+        """恢复最小轮询间隔"""
+        self.interval = WATCH_MIN_INTERVAL
+
+    def poll(self) -> List[str]:
+        """检查一次变化，返回新出现的 ViVeTool 安装目录"""
+        found = []
+        changed = False
+        for path, (level, mtime, names) in list(self._dirs.items()):
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                # 根目录保留以便之后出现，已消失的子目录不再监视
+                if level > 0:
+                    del self._dirs[path]
+                continue
+            if current == mtime:
+                continue
+            changed = True
+            new_mtime, new_names = self._snapshot(path)
+            self._dirs[path] = (level, new_mtime, new_names)
+
+            for name in new_names - names:
+                if name.lower() == VIVETOOL_EXE:
+                    self._report(path, found)
+                    continue
+                sub = os.path.join(path, name)
+                if name[0] in ".$" or name.lower() in PRUNE_DIRS:
+                    continue
+                if not os.path.isdir(sub) or os.path.islink(sub):
+                    continue
+                installs = list(scan_vivetool(Path(sub), self.depth - level - 1))
+                for install in installs:
+                    self._report(install, found)
+                # 新目录可能仍在解压中，继续监视它和其中已有的子目录（如嵌套的同名文件夹）
+                if not installs:
+                    self._track_tree(sub, level + 1)
+
+        if changed:
+            self.interval = WATCH_MIN_INTERVAL
+        else:
+            self.interval = min(self.interval * WATCH_BACKOFF, WATCH_MAX_INTERVAL)
+        return found
+
+
+# ============== 发现缓存 ==============
+def _stat_key(st: os.stat_result) -> List[int]:
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def fingerprint_vivetool(path: str) -> Optional[dict]:
+    """生成 ViVeTool 目录指纹（目录与可执行文件的 mtime、大小、inode），无可执行文件返回 None"""
+    try:
+        exe = None
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.name.lower() == VIVETOOL_EXE and entry.is_file():
+                    exe = entry.name
+                    break
+        if exe is None:
+            return None
+        return {
+            "exe": exe,
+            "dir": _stat_key(os.stat(path)),
+            "exe_stat": _stat_key(os.stat(os.path.join(path, exe))),
+        }
+    except OSError:
+        return None
+
+
+def is_fingerprint_valid(path: str, fingerprint: Optional[dict]) -> bool:
+    """校验缓存指纹是否仍然有效（仅两次 stat）"""
+    if not path or not fingerprint:
+        return False
+    try:
+        if _stat_key(os.stat(path)) != list(fingerprint["dir"]):
+            return False
+        exe_path = os.path.join(path, fingerprint["exe"])
+        return _stat_key(os.stat(exe_path)) == list(fingerprint["exe_stat"])
+    except (OSError, KeyError, TypeError):
+        return False
+
+
+# ============== 命令执行 ==============
+# 捕获输出模式下单次命令的超时（秒）
+VIVETOOL_TIMEOUT = 120
+
+
+def resolve_vivetool_exe(folder: str) -> Optional[str]:
+    """在 ViVeTool 目录中找到可执行文件（也接受无扩展名的 vivetool 脚本，便于测试）"""
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.name.lower() in (VIVETOOL_EXE, "vivetool") and entry.is_file():
+                    return entry.path
+    except OSError:
+        pass
     return None
 
 
+def run_command_captured(
+    args: List[str],
+    working_dir: Optional[str] = None,
+    on_output: Optional[Callable[[str, str], None]] = None,
+    timeout: float = VIVETOOL_TIMEOUT,
+) -> Tuple[int, str, float]:
+    """以子进程执行命令并捕获输出
+
+    stdout/stderr 逐行回调 on_output(line, stream)，不需要任何用户交互。
+    返回 (退出代码, 全部输出, 耗时秒数)；无法启动或超时时退出代码为 -1。
+    """
+    import subprocess
+    start = time.perf_counter()
+    lines = []
+    lock = threading.Lock()
+
+    def pump(pipe, stream):
+        for line in pipe:
+            line = line.rstrip("\r\n")
+            with lock:
+                lines.append(line)
+            if on_output is not None:
+                on_output(line, stream)
+        pipe.close()
+
+    try:
+        proc = subprocess.Popen(
+            args,
+            cwd=working_dir if working_dir and os.path.isdir(working_dir) else None,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+    except OSError as e:
+        return -1, f"启动进程失败: {e}", time.perf_counter() - start
+
+    readers = [
+        threading.Thread(target=pump, args=(proc.stdout, "stdout"), daemon=True),
+        threading.Thread(target=pump, args=(proc.stderr, "stderr"), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    try:
+        code = proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        code = -1
+        lines.append(f"命令执行超时（{timeout} 秒）")
+    for reader in readers:
+        reader.join()
+    return code, "\n".join(lines), time.perf_counter() - start
+
+
+class CommandError(Exception):
+    """命令以非零退出代码结束"""
+
+    def __init__(self, code: int, output: str = ""):
+        lines = output.strip().splitlines()
+        super().__init__(f"exit code {code}" + (f": {lines[-1]}" if lines else ""))
+        self.code = code
+        self.output = output
+
+
+def stream_command(args: List[str], working_dir: Optional[str] = None,
+                   timeout: float = VIVETOOL_TIMEOUT) -> Iterator[str]:
+    """以子进程执行命令，逐行产出输出（stderr 合并到 stdout），只保留最后几行
+
+    超时后子进程被结束。无法启动时抛出 OSError；输出读完后退出代码非零（含超时）时抛出 CommandError，
+    调用方因此不会把失败的输出当作完整结果。
+    """
+    import subprocess
+    proc = subprocess.Popen(
+        args,
+        cwd=working_dir if working_dir and os.path.isdir(working_dir) else None,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+    )
+    killer = threading.Timer(timeout, proc.kill)
+    killer.daemon = True
+    killer.start()
+    tail: deque = deque(maxlen=5)
+    try:
+        for line in proc.stdout:
+            line = line.rstrip("\r\n")
+            tail.append(line)
+            yield line
+    finally:
+        killer.cancel()
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+    if proc.returncode != 0:
+        raise CommandError(proc.returncode, "\n".join(tail))
+
+
+# ============== 分批执行 ==============
+# cmd.exe 单行命令长度上限
+CMD_MAX_LENGTH = 8191
+
+
+def plan_batches(ids: List[str], prefix_length: int, max_length: int = CMD_MAX_LENGTH,
+                 max_ids: Optional[int] = None) -> List[List[str]]:
+    """把 ID 切分成若干批，保证 前缀 + 逗号分隔的 ID 不超过 max_length，可选限制每批 ID 数"""
+    budget = max_length - prefix_length
+    batches = []
+    current = []
+    length = 0
+    for fid in ids:
+        extra = len(fid) + (1 if current else 0)
+        if current and (length + extra > budget or (max_ids and len(current) >= max_ids)):
+            batches.append(current)
+            current = []
+            length = 0
+            extra = len(fid)
+        current.append(fid)
+        length += extra
+    if current:
+        batches.append(current)
+    return batches
+
+
+def run_batches(
+    batches: List[List[str]],
+    run_batch: Callable[[List[str]], Tuple[int, str, float]],
+    in_flight: int = 1,
+    on_progress: Optional[Callable[[int, int, List[str], Tuple[int, str, float]], None]] = None,
+) -> Tuple[int, str, float]:
+    """流水线执行各批次，最多 in_flight 批同时进行
+
+    每批完成时回调 on_progress(序号, 总数, 批次, 结果)；
+    汇总结果为 (首个非零退出代码或 0, 按批次顺序拼接的输出, 总耗时)。
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    start = time.perf_counter()
+    results: List[Optional[Tuple[int, str, float]]] = [None] * len(batches)
+    with ThreadPoolExecutor(max_workers=max(1, in_flight)) as pool:
+        futures = {pool.submit(run_batch, batch): i for i, batch in enumerate(batches)}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                results[i] = (-1, str(e), 0.0)
+            if on_progress is not None:
+                on_progress(done, len(batches), batches[i], results[i])
+
+    code = next((r[0] for r in results if r[0] != 0), 0)
+    output = "\n".join(r[1] for r in results if r[1])
+    return code, output, time.perf_counter() - start
+
+
+def run_apply(
+    batches: List[List[str]],
+    run_batch: Callable[[List[str]], Tuple[int, str, float]],
+    in_flight: int = 1,
+    attempts: int = 1,
+    backoff: float = 1.0,
+    on_progress: Optional[Callable[[int, int, List[str], Tuple[int, str, float]], None]] = None,
+    on_retry: Optional[Callable[[int, int, int, float], None]] = None,
+) -> Tuple[Tuple[int, str, float], Dict[str, Tuple[str, Optional[str]]]]:
+    """执行 /enable、/disable 的各批次并解析每个 ID 的结果
+
+    attempts 大于 1 时，仍失败的 ID 按原批次分组，等待 backoff 秒（每次翻倍）后重新发送，
+    重试前回调 on_retry(第几次, 总次数, 失败数, 等待秒数)。
+    返回 (最后一轮的汇总结果, {ID: (结果, 错误代码)})。
+    """
+    results: Dict[str, Tuple[str, Optional[str]]] = {}
+
+    def progress(index, total, batch, result):
+        results.update(parse_apply(result[1].splitlines(), batch, result[0]))
+        if on_progress is not None:
+            on_progress(index, total, batch, result)
+
+    result = run_batches(batches, run_batch, in_flight, progress)
+    for attempt in range(2, attempts + 1):
+        failed = {fid for fid, (outcome, _) in results.items() if outcome == RESULT_ERROR}
+        if not failed:
+            break
+        delay = backoff * 2 ** (attempt - 2)
+        if on_retry is not None:
+            on_retry(attempt, attempts, len(failed), delay)
+        time.sleep(delay)
+        batches = [[fid for fid in batch if fid in failed] for batch in batches]
+        batches = [batch for batch in batches if batch]
+        result = run_batches(batches, run_batch, in_flight, progress)
+    return result, results
+
+
+class BatchTuner:
+    """按批大小相对命令行长度上限的比例统计吞吐（ID/秒），为下次执行选择吞吐最高的比例
+
+    比例以 2 的幂分桶："1/1" 为按长度切满的批，"1/2" 为其一半，依此类推；
+    每个桶同时记录测得它的最大执行规模，只采用规模不小于本次执行的桶。
+    满长度的批测过之前只按命令行长度切分；每隔 EXPLORE_EVERY 批轮流尝试更大、更小一档，以便比较。
+    数据为可直接保存到配置中的字典。
+    """
+
+    EXPLORE_EVERY = 5
+
+    def __init__(self, stats: Optional[dict] = None, ids: Optional[List[str]] = None,
+                 prefix_length: int = 0, max_length: int = CMD_MAX_LENGTH):
+        # 只保留按比例分桶的统计（旧版本按 ID 数分桶的数据不再适用）
+        self.stats = {k: list(v) for k, v in (stats or {}).items() if k.startswith("1/") and len(v) == 4}
+        ids = ids or []
+        self.total = len(ids)
+        # 按平均 ID 长度估算一批最多可放的 ID 数
+        width = sum(map(len, ids)) / len(ids) + 1 if ids else 1
+        self.capacity = max(1, int((max_length - prefix_length + 1) // width))
+
+    def bucket(self, size: int) -> int:
+        """批大小对应的比例分母"""
+        ratio = max(1, self.capacity // max(1, size))
+        return 1 << (ratio.bit_length() - 1)
+
+    def record(self, size: int, seconds: float):
+        """记录一批的执行结果"""
+        key = f"1/{self.bucket(size)}"
+        total_ids, total_secs, batches, largest = self.stats.get(key, [0, 0.0, 0, 0])
+        self.stats[key] = [total_ids + size, round(total_secs + seconds, 4), batches + 1, max(largest, self.total)]
+
+    def throughput(self) -> Dict[int, float]:
+        """在不小于本次规模的执行中测得的各比例的平均吞吐"""
+        return {int(k[2:]): v[0] / v[1] for k, v in self.stats.items() if v[1] > 0 and v[3] >= self.total}
+
+    def suggest(self) -> Optional[int]:
+        """建议的每批 ID 上限，None 表示只按命令行长度切分"""
+        rates = self.throughput()
+        if 1 not in rates:
+            return None
+        best = max(rates, key=rates.get)
+        batches = sum(v[2] for v in self.stats.values())
+        if batches % self.EXPLORE_EVERY == 0:
+            # 轮流尝试更大、更小一档
+            if best > 1 and (batches // self.EXPLORE_EVERY) % 2:
+                best //= 2
+            else:
+                best *= 2
+        if best == 1:
+            return None
+        return max(1, self.capacity // best)
+
+
 def run_command_admin(command: str, working_dir: Optional[str] = None) -> Tuple[bool, str]:
     """以管理员身份执行命令"""
     try:
@@ -110,6 +721,7 @@ def run_command_admin(command: str, working_dir: Optional[str] = None) -> Tuple[
 
         # 以管理员身份执行
         try:
+            import ctypes
             ret = ctypes.windll.shell32.ShellExecuteW(
                 None, "runas", "cmd.exe", f'/c "{bat_path}"', None, 1
             )
@@ -150,6 +762,115 @@ def get_default_ids() -> list:
     return ["57048231", "47205210", "56328729", "48433719"]
 
 
+# ============== 批量导入 ==============
+# 单个范围最多展开的 ID 数，超过的范围记为无效
+IMPORT_MAX_RANGE = 100000
+# 流式读取文件时每块的字符数
+IMPORT_CHUNK = 1 << 20
+# JSON 中表示功能 ID 的键
+IMPORT_JSON_KEYS = ("id", "ids", "feature_id", "feature_ids", "features")
+
+_ID_MAX = 0xFFFFFFFF
+_ID_MAX_TEXT = str(_ID_MAX)
+# 独立的数字或 a-b 范围（不匹配 Feature2、1.5 之类的片段）
+_ID_TOKEN_RE = re.compile(r"(?<![\w.])(\d+)(?:\s*-\s*(\d+))?(?![\w.])")
+_ID_SEPARATORS = str.maketrans({c: " " for c in ",;|\t\r\n\"'[]()"})
+# 块末尾可能被截断的词，留到下一块再解析
+_CHUNK_TAIL_RE = re.compile(r"[\w.]*(?:\s*-\s*\d*)?\s*\Z")
+
+
+def parse_ids(chunks: Iterable[str], stats: Optional[Dict[str, int]] = None) -> Iterator[str]:
+    """流式解析 ID 文本，产出去掉前导零的 ID（未去重）
+
+    ID 之间可用逗号、空白、换行等任意非数字字符分隔，a-b 表示范围；
+    产出的 ID 数累计到 stats["parsed"]，超出 32 位或过大的范围计入 stats["invalid"]。
+    """
+    invalid = parsed = 0
+    for chunk in chunks:
+        # 常见情形：只有 ASCII 数字和分隔符，整块切分即可，不走正则（其他数字字符交给正则规范化）
+        tokens = chunk.translate(_ID_SEPARATORS).split()
+        digits = "".join(tokens)
+        if tokens and digits.isascii() and digits.isdigit():
+            if not any(t[0] == "0" for t in tokens):
+                # 没有前导零时，同为 10 位的数字串按字符串比较即可判断是否超出 32 位
+                if max(map(len, tokens)) > 9:
+                    valid = [t for t in tokens if len(t) < 10 or len(t) == 10 and t <= _ID_MAX_TEXT]
+                    invalid += len(tokens) - len(valid)
+                    tokens = valid
+                parsed += len(tokens)
+                yield from tokens
+                continue
+            for token in tokens:
+                value = int(token)
+                if value == 0 or value > _ID_MAX:
+                    invalid += 1
+                else:
+                    parsed += 1
+                    yield str(value) if token[0] == "0" else token
+            continue
+        for start, end in _ID_TOKEN_RE.findall(chunk):
+            low = int(start)
+            high = int(end) if end else low
+            if low > high:
+                low, high = high, low
+            if low == 0 or high > _ID_MAX or high - low >= IMPORT_MAX_RANGE:
+                invalid += 1
+                continue
+            parsed += high - low + 1
+            if low == high:
+                yield str(low)
+            else:
+                yield from map(str, range(low, high + 1))
+    if stats is not None:
+        stats["parsed"] = stats.get("parsed", 0) + parsed
+        stats["invalid"] = stats.get("invalid", 0) + invalid
+
+
+def read_chunks(f, size: int = IMPORT_CHUNK) -> Iterator[str]:
+    """按块读取文本，块尾未完整的 ID 或范围移到下一块"""
+    carry = ""
+    while True:
+        data = f.read(size)
+        if not data:
+            break
+        chunk = carry + data
+        # 只在块尾一小段里找截断点，避免正则扫描整块
+        cut = _CHUNK_TAIL_RE.search(chunk, max(0, len(chunk) - 256)).start()
+        carry = chunk[cut:]
+        if cut:
+            yield chunk[:cut]
+    if carry:
+        yield carry
+
+
+def _json_id_values(node, take: bool = True) -> Iterator[str]:
+    """遍历 JSON 取 ID 文本
+
+    take 表示此处的数字/字符串是否为 ID：顶层数组和 ID 键下的值为真，数组把它传给元素；
+    对象不继承，只有键在 IMPORT_JSON_KEYS 中的值才取，其他键只向下查找。
+    """
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from _json_id_values(value, str(key).lower() in IMPORT_JSON_KEYS)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _json_id_values(value, take)
+    elif take and isinstance(node, (int, str)) and not isinstance(node, bool):
+        yield str(node)
+
+
+def iter_id_file(path: str) -> Iterator[str]:
+    """逐块产出 ID 文件的文本（.json 按结构取 ID，其余按文本流式读取）"""
+    if path.lower().endswith(".json"):
+        import json
+        with open(path, "r", encoding="utf-8-sig") as f:
+            data = json.load(f)
+        yield ",".join(_json_id_values(data))
+        return
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        yield from read_chunks(f)
+
+
 def restart_pc() -> bool:
     """重启计算机"""
     try:
@@ -166,6 +887,7 @@ def restart_pc() -> bool:
         else:
             # 如果上述方法失败，尝试使用 Windows API
             try:
+                import ctypes
                 ctypes.windll.shell32.ShutdownSystem(2)
                 return True
             except: